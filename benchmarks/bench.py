@@ -0,0 +1,178 @@
+"""Micro-benchmarks of the hot paths of compositio.
+
+    python benchmarks/bench.py                       # print results as JSON
+    python benchmarks/bench.py --save baseline.json  # save results
+    python benchmarks/bench.py --compare baseline.json --tolerance 0.1
+
+Each benchmark reports the best of `--repeat` runs, in seconds. With `--compare`, benchmarks slower than the
+baseline by more than `--tolerance` are listed and the exit status is 1.
+"""
+
+import argparse
+import json
+import operator
+import platform
+import sys
+import timeit
+from typing import Callable
+
+from compositio import maybe as M
+from compositio import result as R
+from compositio import writer as W
+from compositio.arrows import Arrow, mapa, mapca, reducea
+from compositio.combinators import curry
+
+type Bench = Callable[[int], Callable[[], object]]
+
+BENCHMARKS: dict[str, Bench] = {}
+
+
+def benchmark(f: Bench) -> Bench:
+    """Register a benchmark: a function of the input size returning the thunk to time."""
+    BENCHMARKS[f.__name__] = f
+    return f
+
+
+def inc(x: int) -> int:
+    return x + 1
+
+
+@benchmark
+def arrow_chain(n: int):
+    """A 200 stage >> chain, applied n / 200 times."""
+    chain = Arrow(inc)
+    for _ in range(199):
+        chain = chain >> inc
+    return lambda: [chain(x) for x in range(n // 200)]
+
+
+@benchmark
+def arrow_split_fanout(n: int):
+    pipeline = Arrow(inc) % Arrow(inc) >> Arrow(inc) * Arrow(inc)
+    return lambda: [pipeline(x) for x in range(n)]
+
+
+@benchmark
+def arrow_mapa(n: int):
+    pipeline = mapa(inc) >> mapa(inc) >> list
+    return lambda: pipeline(range(n))
+
+
+@benchmark
+def arrow_mapca(n: int):
+    """Thread pool map over n items."""
+    pipeline = mapca(inc) >> list
+    return lambda: pipeline(range(n))
+
+
+@benchmark
+def arrow_reducea(n: int):
+    pipeline = reducea(operator.add, 0)
+    return lambda: pipeline(range(n))
+
+
+@benchmark
+def maybe_bind_chain(n: int):
+    def step(x: int) -> M.Maybe[int]:
+        return M.just(x + 1)
+
+    def run():
+        m = M.just(0)
+        for _ in range(n):
+            m = m.bind(step)
+        return m
+
+    return run
+
+
+@benchmark
+def maybe_traverse(n: int):
+    xs = list(range(n))
+    return lambda: M.traverse(M.just, xs)
+
+
+@benchmark
+def result_bind_chain(n: int):
+    def step(x: int) -> R.Result[int, str]:
+        return R.ok(x + 1)
+
+    def run():
+        r = R.ok(0)
+        for _ in range(n):
+            r = r.bind(step)
+        return r
+
+    return run
+
+
+@benchmark
+def writer_bind_log(n: int):
+    """n / 100 binds, each appending to the log."""
+
+    def step(x: int) -> W.Writer[int, str]:
+        return W.write(x + 1, "step")
+
+    def run():
+        w = W.Writer.pure(0)
+        for _ in range(n // 100):
+            w = w.bind(step)
+        return w.run()
+
+    return run
+
+
+@benchmark
+def curry_call(n: int):
+    add = curry(operator.add)
+    return lambda: [add(x)(x) for x in range(n)]
+
+
+def run(names: list[str], n: int, repeat: int) -> dict[str, float]:
+    results = {}
+    for name in names:
+        thunk = BENCHMARKS[name](n)
+        results[name] = min(timeit.repeat(thunk, number=1, repeat=repeat))
+        print(f"{name:24} {results[name]:.4f}s", file=sys.stderr)
+    return results
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """Names of the benchmarks slower than the baseline by more than `tolerance` (a fraction)."""
+    return [
+        name for name, seconds in results.items() if name in baseline and seconds > baseline[name] * (1 + tolerance)
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("-n", type=int, default=10**6, help="input size (default: 10^6)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed slowdown vs. baseline (default: 0.1)")
+    args = parser.parse_args(argv)
+    if unknown := set(args.names) - BENCHMARKS.keys():
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run(args.names or list(BENCHMARKS), args.n, args.repeat)
+    report = {"python": platform.python_version(), "n": args.n, "results": results}
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        for name in sorted(results.keys() & baseline.keys()):
+            print(f"{name:24} {results[name] / baseline[name]:6.2f}x", file=sys.stderr)
+        if regressions := compare(results, baseline, args.tolerance):
+            print(f"Slower than baseline: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Arrows over coroutines, for asyncio.
+
+`AsyncArrow` has the same operators as `Arrow`, but calling it returns a coroutine. Stages may be sync or async
+functions; awaitable results are awaited before being passed on. `*` and `%` run both branches concurrently.
+"""
+
+import asyncio
+import collections
+import inspect
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Coroutine, Iterable
+
+from compositio.arrows import Arrow
+
+
+async def _call[A, B](f: Callable[[A], B | Awaitable[B]], x: A) -> B:
+    y = f(x)
+    if inspect.isawaitable(y):
+        return await y
+    return y
+
+
+class AsyncArrow[A, B](Arrow[A, Coroutine[Any, Any, B]]):
+    """Arrow whose stages may be coroutine functions.
+
+    >>> async def fetch(x):
+    ...     await asyncio.sleep(0)
+    ...     return x * 2
+    >>> pipeline = Arrow(lambda x: x + 1) >> AsyncArrow(fetch) >> str
+    >>> asyncio.run(pipeline(1))
+    '4'
+    >>> asyncio.run((AsyncArrow(fetch) % Arrow(str))(1))
+    (2, '1')
+    >>> asyncio.run((1, 2) | AsyncArrow(fetch) * AsyncArrow(fetch))
+    (2, 4)
+    """
+
+    def __init__(self, f: Callable[[A], B | Awaitable[B]]):
+        super().__init__(f)  # type: ignore[arg-type]
+
+    @staticmethod
+    def _compile(stages: tuple[Callable[[Any], Any], ...]) -> Callable[[Any], Awaitable[Any]]:
+        async def run(x):
+            for f in stages:
+                x = f(x)
+                if inspect.isawaitable(x):
+                    x = await x
+            return x
+
+        return run
+
+    # The operators take sync or async functions and always return async arrows, hence the ignored overrides.
+
+    def __rrshift__[C](self, other: Callable[[C], A | Awaitable[A]]) -> "AsyncArrow[C, B]":  # type: ignore[override]
+        return AsyncArrow._of(_stages(other) + self.stages)
+
+    def __rshift__[C](self, other: Callable[[B], C | Awaitable[C]]) -> "AsyncArrow[A, C]":  # type: ignore[override]
+        return AsyncArrow._of(self.stages + _stages(other))
+
+    def __mul__[C, D](  # type: ignore[override]
+        self, other: Callable[[C], D | Awaitable[D]]
+    ) -> "AsyncArrow[tuple[A, C], tuple[B, D]]":
+        return AsyncArrow(Split(self, other))
+
+    def __rmul__[C, D](self, other: Callable[[C], D | Awaitable[D]]) -> "AsyncArrow[tuple[C, A], tuple[D, B]]":
+        return AsyncArrow(Split(other, self))
+
+    def __mod__[C](  # type: ignore[override]
+        self, other: Callable[[A], C | Awaitable[C]]
+    ) -> "AsyncArrow[A, tuple[B, C]]":
+        return AsyncArrow(Fanout(self, other))
+
+    def __rmod__[C](self, other: Callable[[A], C | Awaitable[C]]) -> "AsyncArrow[A, tuple[C, B]]":
+        return AsyncArrow(Fanout(other, self))
+
+
+def _stages(other: Callable[[Any], Any]) -> tuple[Callable[[Any], Any], ...]:
+    match other:
+        case Arrow() if type(other) is Arrow or type(other) is AsyncArrow:
+            return other.stages
+        case _:
+            return (other,)
+
+
+@dataclass(frozen=True)
+class Split[A, B, C, D]:
+    """(***) (x, y) -> (f x, g y), concurrently"""
+
+    f: Callable[[A], B | Awaitable[B]]
+    g: Callable[[C], D | Awaitable[D]]
+
+    async def __call__(self, xy: tuple[A, C]) -> tuple[B, D]:
+        b, d = await asyncio.gather(_call(self.f, xy[0]), _call(self.g, xy[1]))
+        return (b, d)
+
+
+@dataclass(frozen=True)
+class Fanout[A, B, C]:
+    """(&&&) x -> (f x, g x), concurrently"""
+
+    f: Callable[[A], B | Awaitable[B]]
+    g: Callable[[A], C | Awaitable[C]]
+
+    async def __call__(self, x: A) -> tuple[B, C]:
+        b, c = await asyncio.gather(_call(self.f, x), _call(self.g, x))
+        return (b, c)
+
+
+@dataclass(frozen=True)
+class Map[I, O]:
+    """xs -> amap(f, xs, limit)"""
+
+    f: Callable[[I], O | Awaitable[O]]
+    limit: int = 64
+
+    def __call__(self, xs: Iterable[I] | AsyncIterable[I]) -> AsyncIterator[O]:
+        return amap(self.f, xs, self.limit)
+
+
+async def _aiter[T](xs: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+    if isinstance(xs, AsyncIterable):
+        async for x in xs:
+            yield x
+    else:
+        for x in xs:
+            yield x
+
+
+async def amap[I, O](
+    f: Callable[[I], O | Awaitable[O]], xs: Iterable[I] | AsyncIterable[I], limit: int = 64
+) -> AsyncIterator[O]:
+    """Concurrent map over a (possibly async) iterable, with at most `limit` calls in flight.
+
+    Results come in input order; pending calls are cancelled if the consumer stops early.
+    """
+    pending: collections.deque[asyncio.Future[O]] = collections.deque()
+    try:
+        async for x in _aiter(xs):
+            pending.append(asyncio.ensure_future(_call(f, x)))
+            if len(pending) >= limit:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
+def amapa[I, O](f: Callable[[I], O | Awaitable[O]], limit: int = 64):
+    """Concurrent async map that works like an arrow.
+
+    >>> async def double(x):
+    ...     await asyncio.sleep(0)
+    ...     return x * 2
+    >>> asyncio.run((amapa(double, limit=2) >> alist)([2, 3, 5]))
+    [4, 6, 10]
+
+    """
+    return AsyncArrow[Iterable[I] | AsyncIterable[I], AsyncIterator[O]](Map(f, limit))
+
+
+async def alist[T](xs: AsyncIterable[T]) -> list[T]:
+    """Collect an async iterable into a list."""
+    return [x async for x in xs]
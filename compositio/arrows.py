@@ -1,16 +1,99 @@
-import functools
-from typing import Callable, Iterable
+import concurrent.futures
+from typing import Any, Callable, Hashable, Iterable, Self, Sequence
 
 import compositio.combinators as Comb
+from compositio.cache import Cached, ContentKey, DiskCache, LRUCache
+from compositio.monoid import Monoid
+from compositio.result import Result
+import compositio.ir as IR
 
 
 class Arrow[A, B]:
-    f: Callable[[A], B]
+    """A composable function.
+
+    Composition with `>>` does not nest closures: it concatenates the flat tuple of `stages`, which is compiled
+    into a single function on first call. Call depth stays constant however long the pipeline gets.
+
+    >>> inc = Arrow(lambda x : x + 1)
+    >>> len((inc >> inc >> inc).stages)
+    3
+
+    Stages are plain callables or `compositio.ir` nodes, so an arrow pickles whenever its functions do.
+
+    >>> import pickle, operator
+    >>> pipeline = mapa(operator.neg) >> reducea(operator.add, 0)
+    >>> pipeline
+    Arrow(Map(f=<built-in function neg>) >> Reduce(f=<built-in function add>, z=0))
+    >>> pickle.loads(pickle.dumps(pipeline))([1, 2, 3])
+    -6
+    """
+
+    stages: tuple[Callable[[Any], Any], ...]
 
     __match_args__ = ("f",)
 
     def __init__(self, f: Callable[[A], B]):
-        self.f = f
+        # Only plain arrows and arrows of the same kind share a stage representation; any other arrow is one stage.
+        match f:
+            case Arrow() if type(f) is Arrow or type(f) is type(self):
+                self.stages = f.stages
+            case _:
+                self.stages = (f,)
+        self._f = None
+
+    @classmethod
+    def _of(cls, stages: tuple[Callable[[Any], Any], ...]) -> Self:
+        arrow = cls.__new__(cls)
+        arrow.stages = stages
+        arrow._f = None
+        return arrow
+
+    @property
+    def f(self) -> Callable[[A], B]:
+        """The function of the arrow, compiled from `stages` on first use."""
+        if self._f is None:
+            self._f = self._compile(self.stages)
+        return self._f
+
+    @f.setter
+    def f(self, f: Callable[[A], B]):
+        self.stages = (f,)
+        self._f = None
+
+    @staticmethod
+    def _compile(stages: tuple[Callable[[Any], Any], ...]) -> Callable[[Any], Any]:
+        """Compile a flat tuple of stages into a single function that runs them in a loop.
+
+        Adjacent `mapa`, `filtera` and `flatmapa` stages are fused into one loop (see `ir.fuse`).
+        """
+        match IR.fuse(stages):
+            case (f,):
+                return f
+            case fused:
+
+                def run(x):
+                    for f in fused:
+                        x = f(x)
+                    return x
+
+                return run
+
+    def __reduce__(self):
+        return (type(self)._of, (self.stages,))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({' >> '.join(map(IR.name, self.stages))})"
+
+    @staticmethod
+    def vectorized[I, O](f: Callable[[Sequence[I]], Sequence[O]]) -> "BatchArrow[I, O]":
+        """Batch arrow from a function over whole chunks (e.g. a NumPy ufunc). See `BatchArrow`."""
+        return BatchArrow(f)
+
+    def cached(
+        self, maxsize: int | None = 128, ttl: float | None = None, key: Callable[[A], Hashable] | None = None
+    ) -> "Arrow[A, B]":
+        """Memoized version of this arrow. See `cachea`."""
+        return cachea(self, maxsize, ttl, key)
 
     def __call__(self, x: A):
         """Arrow application.
@@ -18,7 +101,10 @@ class Arrow[A, B]:
         A(x) = A.f(x)
 
         """
-        return self.f(x)
+        f = self._f
+        if f is None:
+            f = self.f
+        return f(x)
 
     __ror__ = __call__
     __or__ = __call__
@@ -39,17 +125,9 @@ class Arrow[A, B]:
 
         match other:
             case Arrow():
-
-                def h(x: C):
-                    return self.f(other.f(x))
-
-                return Arrow(h)
+                return Arrow._of(other.stages + self.stages)
             case _:
-
-                def g(x: C):
-                    return self.f(other(x))
-
-                return Arrow(g)
+                return Arrow._of((other,) + self.stages)
 
     def __rshift__[C](self, other: "Arrow[B, C]" | Callable[[B], C]) -> "Arrow[A, C]":
         """Arrow composition.
@@ -67,17 +145,9 @@ class Arrow[A, B]:
 
         match other:
             case Arrow():
-
-                def h(x: A):
-                    return other.f(self.f(x))
-
-                return Arrow(h)
+                return Arrow._of(self.stages + other.stages)
             case _:
-
-                def g(x: A):
-                    return other(self.f(x))
-
-                return Arrow(g)
+                return Arrow._of(self.stages + (other,))
 
     def __mul__[C, D](self, other: "Arrow[C, D]"):
         """(***) Split the input between the two argument arrows and combine their output.
@@ -99,7 +169,7 @@ class Arrow[A, B]:
         (6, 20)
         """
 
-        return Arrow(Comb.agg(self.f, other.f))
+        return Arrow(IR.Split(self, other))
 
     def __mod__[C](self, other: "Arrow[A, C]") -> "Arrow[A, tuple[B, C]]":
         """(&&&) Fanout
@@ -121,18 +191,41 @@ class Arrow[A, B]:
         (11, 20)
         """
 
-        def h(x: A):  # pylint: disable=undefined-variable
-            return (x, x)
-
-        return Arrow(h) >> (self * other)
+        return Arrow(IR.Fanout(self, other))
 
     ## Choice ##
 
-    ## TODO (+++)
-    # def __add__(self, )
+    def __add__[C, D](self, other: "Arrow[C, D]") -> "Arrow[Result[A, C], Result[B, D]]":
+        """(+++) Run `self` on Ok values and `other` on errors, keeping the tag.
+
+        (A -> B, C -> D) ==> Result[A, C] -> Result[B, D]
+
+           |--> self -->|
+        -->|            |-->
+           |--> other ->|
+
+        >>> from compositio.result import ok, err
+        >>> addOne = Arrow(lambda x : x + 1)
+        >>> double = Arrow(lambda x : x * 2)
+        >>> (addOne + double)(ok(10)), (addOne + double)(err(10))
+        (Ok(11), Err(20))
+        """
+
+        return Arrow(IR.Choice(self, other))
+
+    def __sub__[C](self, other: "Arrow[C, B]") -> "Arrow[Result[A, C], B]":
+        """(|||) Fanin: run `self` on Ok values and `other` on errors, dropping the tag.
 
-    ## TODO (|||)
-    # def __sub__(self, )
+        (A -> B, C -> B) ==> Result[A, C] -> B
+
+        >>> from compositio.result import ok, err
+        >>> addOne = Arrow(lambda x : x + 1)
+        >>> double = Arrow(lambda x : x * 2)
+        >>> (addOne - double)(ok(10)), (addOne - double)(err(10))
+        (11, 20)
+        """
+
+        return Arrow(IR.Fanin(self, other))
 
     ## Other ##
 
@@ -170,6 +263,89 @@ class Arrow[A, B]:
     #     return Arrow(h)
 
 
+class BatchArrow[A, B](Arrow[Sequence[A], Sequence[B]]):
+    """Arrow from chunk to chunk (a list or a NumPy array), calling each function once per chunk.
+
+    Scalar arrows and functions composed with a batch arrow are lifted to run element-wise over the chunk.
+    `*` splits a pair of chunks and `%` fans a chunk out to both arrows.
+
+    >>> double = Arrow.vectorized(lambda xs: [x * 2 for x in xs])
+    >>> (double >> (lambda x: x + 1))([1, 2, 3])
+    [3, 5, 7]
+    >>> (Arrow(lambda x: x + 1) >> double)([1, 2, 3])
+    [4, 6, 8]
+    >>> (double % Arrow(str))([1, 2])
+    ([2, 4], ['1', '2'])
+    """
+
+    # The operators take scalar or batch functions and always return batch arrows, hence the ignored overrides.
+    # `*` and `%` give arrows over pairs of chunks, which `BatchArrow[A, B]` cannot express.
+
+    def __rrshift__(self, other: Callable[[Any], Any]) -> "BatchArrow[Any, B]":  # type: ignore[override]
+        return BatchArrow._of(_batch_stages(other) + self.stages)
+
+    def __rshift__(self, other: Callable[[Any], Any]) -> "BatchArrow[A, Any]":  # type: ignore[override]
+        return BatchArrow._of(self.stages + _batch_stages(other))
+
+    def __mul__(self, other: Callable[[Any], Any]) -> "BatchArrow[Any, Any]":  # type: ignore[override]
+        return BatchArrow._of((IR.Split(self, _lift(other)),))
+
+    def __rmul__(self, other: Callable[[Any], Any]) -> "BatchArrow[Any, Any]":
+        return BatchArrow._of((IR.Split(_lift(other), self),))
+
+    def __mod__(self, other: Callable[[Any], Any]) -> "BatchArrow[Any, Any]":  # type: ignore[override]
+        return BatchArrow._of((IR.Fanout(self, _lift(other)),))
+
+    def __rmod__(self, other: Callable[[Any], Any]) -> "BatchArrow[Any, Any]":
+        return BatchArrow._of((IR.Fanout(_lift(other), self),))
+
+
+def _lift(other: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    match other:
+        case BatchArrow():
+            return other
+        case _:
+            return IR.Lift(other)
+
+
+def _batch_stages(other: Callable[[Any], Any]) -> tuple[Callable[[Any], Any], ...]:
+    match other:
+        case BatchArrow():
+            return other.stages
+        case _:
+            return (IR.Lift(other),)
+
+
+def splitca[A, B, C, D](
+    f: "Arrow[A, B]", g: "Arrow[C, D]", pool: concurrent.futures.Executor | None = None
+) -> "Arrow[tuple[A, C], tuple[B, D]]":
+    """Concurrent version of (***): `g` runs on `pool` (default `compositio.pool.shared()`) while `f` runs.
+
+    Both branches always complete; if both raise, the exception of `f` is raised.
+
+    >>> addOne = Arrow(lambda x : x + 1)
+    >>> double = Arrow(lambda x : x * 2)
+    >>> splitca(addOne, double)((5, 10))
+    (6, 20)
+    """
+    return Arrow(IR.ConcurrentSplit(f, g, pool))
+
+
+def fanoutca[A, B, C](
+    f: "Arrow[A, B]", g: "Arrow[A, C]", pool: concurrent.futures.Executor | None = None
+) -> "Arrow[A, tuple[B, C]]":
+    """Concurrent version of (&&&): `g` runs on `pool` (default `compositio.pool.shared()`) while `f` runs.
+
+    Both branches always complete; if both raise, the exception of `f` is raised.
+
+    >>> addOne = Arrow(lambda x : x + 1)
+    >>> double = Arrow(lambda x : x * 2)
+    >>> fanoutca(addOne, double)(10)
+    (11, 20)
+    """
+    return Arrow(IR.ConcurrentFanout(f, g, pool))
+
+
 def first[A, B, T](arrow: "Arrow[A, B]") -> Arrow[tuple[A, T], tuple[B, T]]:
     """
     Send the first component of the input through the argument arrow, and copy the rest unchanged to the output.
@@ -200,17 +376,174 @@ def mapa[I, O](f: Callable[[I], O]):
     [3, 4, 6, 8, 12]
 
     """
-    return Arrow[Iterable[I], Iterable[O]](lambda xs: map(f, xs))
+    return Arrow[Iterable[I], Iterable[O]](IR.Map(f))
+
+
+def filtera[I](f: Callable[[I], object]):
+    """Version of filter that works like an arrow.
+
+    >>> [2, 3, 5, 7, 11] | filtera(lambda x : x > 4) >> list
+    [5, 7, 11]
+
+    """
+    return Arrow[Iterable[I], Iterable[I]](IR.Filter(f))
+
 
+def flatmapa[I, O](f: Callable[[I], Iterable[O]]):
+    """Map `f` and flatten the resulting iterables, like an arrow.
 
-def mapca[I, O](f: Callable[[I], O]):
+    Chains of `mapa`, `filtera` and `flatmapa` composed with `>>` run as a single loop, without intermediate
+    iterators.
+
+    >>> [1, 2, 3] | flatmapa(range) >> mapa(lambda x: x * 10) >> list
+    [0, 0, 10, 0, 10, 20]
+
+    """
+    return Arrow[Iterable[I], Iterable[O]](IR.FlatMap(f))
+
+
+def mapchoicea[A, B, C, D](
+    arrow: "Arrow[Result[A, C], Any]",
+    lift: Callable[[Callable[[Any], Any]], Callable[[list[Any]], Iterable[Any]]] = mapa,
+):
+    """Apply a choice arrow (`f + g` or `f - g`) to a collection, one bulk call per branch.
+
+    Inputs are partitioned by tag once; each branch, lifted to lists with `lift` (e.g. `mapa`, `mapca`), runs over
+    its whole sub-batch, and the outputs are put back in input order. Batch arrows are not lifted: they get the
+    sub-batch as is.
+
+    >>> from compositio.result import ok, err
+    >>> double = Arrow.vectorized(lambda xs: [x * 2 for x in xs])
+    >>> [ok(1), err("a"), ok(2)] | mapchoicea(double + Arrow(str.upper))
+    [Ok(2), Err('A'), Ok(4)]
+    >>> [ok(1), err("a"), ok(2)] | mapchoicea(Arrow(str) - Arrow(str.upper), lift=mapca)
+    ['1', 'A', '2']
+
+    """
+    match arrow.stages:
+        case (IR.Choice() | IR.Fanin() as choice,):
+            lifted = [f if isinstance(f, BatchArrow) else lift(f) for f in (choice.f, choice.g)]
+            return Arrow[Iterable[Result[A, C]], list[Any]](IR.Partitioned(*lifted, isinstance(choice, IR.Fanin)))
+        case _:
+            raise TypeError(f"Not a choice arrow: {arrow!r}")
+
+
+def mapca[I, O](
+    f: Callable[[I], O],
+    max_workers: int = 4,
+    window: int | None = None,
+    ordered: bool = True,
+    pool: concurrent.futures.Executor | None = None,
+):
     """Concurrent map that works like an arrow.
 
+    The map is lazy and keeps at most `window` tasks in flight (see `combinators.mapc`). Pass a `pool` (e.g.
+    `compositio.pool.shared()`) to reuse its threads across calls.
+
     >>> list(mapca(lambda x : x + 1)([2, 3, 5, 7, 11]))
     [3, 4, 6, 8, 12]
 
+    >>> sorted(mapca(lambda x : x + 1, ordered=False)([2, 3, 5, 7, 11]))
+    [3, 4, 6, 8, 12]
+
+    """
+    return Arrow[Iterable[I], Iterable[O]](IR.ConcurrentMap(f, max_workers, window, ordered, pool))
+
+
+def mappa[I, O](f: Callable[[I], O], max_workers: int | None = None, chunksize: int | None = None, min_items: int = 2):
+    """Parallel map on a process pool that works like an arrow.
+
+    Lazy and ordered, with adaptive chunking (see `combinators.mapp`). For CPU bound, picklable `f`.
+
+    >>> import operator
+    >>> list(mappa(operator.neg)([2, 3, 5, 7, 11]))
+    [-2, -3, -5, -7, -11]
+
+    """
+    return Arrow[Iterable[I], Iterable[O]](IR.ProcessMap(f, max_workers, chunksize, min_items))
+
+
+def batcha[I, O](f: Callable[[Sequence[I]], Sequence[O]], size: int = 1024):
+    """Version of map that calls `f` (usually a `BatchArrow`) once per chunk of `size` elements.
+
+    Iterables are consumed lazily in list chunks; NumPy arrays are sliced and the results concatenated.
+
+    >>> double = Arrow.vectorized(lambda xs: [x * 2 for x in xs])
+    >>> list(batcha(double, size=2)([2, 3, 5, 7, 11]))
+    [4, 6, 10, 14, 22]
+
+    """
+    return Arrow[Iterable[I], Iterable[O]](IR.Batched(f, size))
+
+
+def reducepa[I, O](
+    monoid: Monoid[O, I],
+    chunksize: int = 10_000,
+    max_workers: int | None = None,
+    executor: concurrent.futures.Executor | None = None,
+):
+    """Parallel reduce that works like an arrow, for an associative operation given as a `Monoid`.
+
+    Chunks are reduced on a process pool (or `executor`) and combined in a balanced tree; see
+    `combinators.reducep`. The monoid's functions must be picklable for a process pool.
+
+    >>> from compositio.monoid import SUM
+    >>> reducepa(SUM, chunksize=2)([2, 3, 5, 7, 11])
+    28
+
+    """
+    return Arrow[Iterable[I], O](IR.ParallelReduce(monoid, chunksize, max_workers, executor))
+
+
+def cachea[I, O](
+    f: Callable[[I], O],
+    maxsize: int | None = 128,
+    ttl: float | None = None,
+    key: Callable[[I], Hashable] | None = None,
+    cache: LRUCache[Hashable, O] | None = None,
+):
+    """Memoizing arrow, with LRU and (optionally, in seconds) TTL eviction.
+
+    `key` maps inputs to cache keys, e.g. for unhashable inputs. The cache is thread-safe, so the stage can run
+    under `mapca`. Its counters are available through the stage.
+
+    >>> parse = cachea(int, maxsize=2)
+    >>> list(mapa(parse)(["1", "2", "1"]))
+    [1, 2, 1]
+    >>> parse.stages[0].stats()
+    CacheStats(hits=1, misses=2, evictions=0, size=2)
+
+    """
+    return Arrow[I, O](Cached(f, cache if cache is not None else LRUCache(maxsize, ttl), key))
+
+
+def persista[I, O](f: Callable[[I], O], cache: DiskCache, version: str = "", name: str | None = None):
+    """Arrow memoized in a persistent `DiskCache`, keyed by a content hash of the input.
+
+    Entries are qualified by the stage `name` (default: the qualified name of `f`) and `version`; change the
+    version when `f` changes. Lambdas, local functions, partials and other callables without a stable name need
+    an explicit `name`. Inputs and outputs must be picklable, so persist per-item stages (`mapa(persista(f, cache))`)
+    rather than stages returning iterators.
+
+    >>> import tempfile, os
+    >>> with tempfile.TemporaryDirectory() as d:
+    ...     parse = persista(int, DiskCache(os.path.join(d, "cache.db")), version="1")
+    ...     list(mapa(parse)(["1", "2", "1"]))
+    ...     parse.stages[0].stats()
+    [1, 2, 1]
+    CacheStats(hits=1, misses=2, evictions=0, size=2)
+    >>> persista(lambda x: x, DiskCache(":memory:"))
+    Traceback (most recent call last):
+    ...
+    ValueError: persista needs an explicit name for <lambda>, its name is not stable across runs
+
     """
-    return Arrow[Iterable[I], Iterable[O]](lambda xs: Comb.mapc(f, xs))
+    if name is None:
+        qualname = getattr(f, "__qualname__", None)
+        if not isinstance(qualname, str) or "<" in qualname:
+            raise ValueError(f"persista needs an explicit name for {IR.name(f)}, its name is not stable across runs")
+        name = qualname
+    return Arrow[I, O](Cached(f, cache, ContentKey(name, version)))
 
 
 def reducea[I, O](f: Callable[[O, I], O], z: O):
@@ -226,4 +559,4 @@ def reducea[I, O](f: Callable[[O, I], O], z: O):
     '235711'
 
     """
-    return Arrow[Iterable[I], O](lambda xs: functools.reduce(f, xs, z))
+    return Arrow[Iterable[I], O](IR.Reduce(f, z))
@@ -0,0 +1,274 @@
+"""Memoization of arrow stages, in memory (`LRUCache`) or on disk (`DiskCache`)."""
+
+import collections
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+MISSING: Any = object()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    """Entries dropped for lack of room or because they expired."""
+    size: int
+
+
+class LRUCache[K: Hashable, V]:
+    """Thread-safe cache with least-recently-used eviction and optional time-to-live (in seconds).
+
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.put("a", 1); cache.put("b", 2); cache.put("c", 3)
+    >>> cache.get("a") is MISSING, cache.get("c")
+    (True, 3)
+    >>> cache.stats()
+    CacheStats(hits=1, misses=1, evictions=1, size=2)
+
+    Pickling keeps the configuration but not the entries.
+    """
+
+    def __init__(
+        self, maxsize: int | None = 128, ttl: float | None = None, clock: Callable[[], float] = time.monotonic
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._init()
+
+    def _init(self):
+        self._entries: collections.OrderedDict[K, tuple[V, float]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: K) -> V:
+        """The value for `key`, or `MISSING`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if self.ttl is None or expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._evictions += 1
+            self._misses += 1
+            return MISSING
+
+    def put(self, key: K, value: V):
+        with self._lock:
+            expires = self.clock() + self.ttl if self.ttl is not None else 0.0
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self):
+        return {"maxsize": self.maxsize, "ttl": self.ttl, "clock": self.clock}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init()
+
+
+@dataclass(frozen=True)
+class Cached[I, O]:
+    """x -> f x, memoized in `cache` under `key(x)` (or `x` itself).
+
+    Concurrent misses on the same key may each call `f`; the last result is kept.
+    """
+
+    f: Callable[[I], O]
+    cache: "LRUCache[Hashable, O] | DiskCache"
+    key: Callable[[I], Hashable] | None = None
+
+    def __call__(self, x: I) -> O:
+        k: Any = x if self.key is None else self.key(x)
+        y = self.cache.get(k)
+        if y is MISSING:
+            y = self.f(x)
+            self.cache.put(k, y)
+        return y
+
+    def stats(self) -> CacheStats:
+        return self.cache.stats()
+
+
+class DiskCache:
+    """Persistent cache in a sqlite file, with least-recently-used eviction beyond `max_entries` or `max_bytes`.
+
+    Keys are bytes (see `ContentKey`) and values are pickled. Every thread and process opens its own connection,
+    so the cache can be shared by `mapca` threads and `mappa` workers. Hit/miss counters are per instance.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as d:
+    ...     cache = DiskCache(os.path.join(d, "cache.db"), max_entries=1)
+    ...     cache.put(b"a", [1]); cache.put(b"b", [2])
+    ...     cache.get(b"a") is MISSING, cache.get(b"b")
+    ...     cache.stats()
+    (True, [2])
+    CacheStats(hits=1, misses=1, evictions=1, size=1)
+    """
+
+    def __init__(self, path: str | os.PathLike, max_entries: int | None = None, max_bytes: int | None = None):
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._init()
+        with self._connection() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key BLOB PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            # Running totals, so that puts don't have to scan the table to decide whether to evict.
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS meta (id INTEGER PRIMARY KEY CHECK (id = 0), count INTEGER, bytes INTEGER)"
+            )
+            db.execute("INSERT OR IGNORE INTO meta SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+
+    def _init(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def get(self, key: bytes) -> Any:
+        """The value for `key`, or `MISSING`."""
+        db = self._connection()
+        row = db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self._misses += 1
+                return MISSING
+            self._hits += 1
+        db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0])
+
+    def put(self, key: bytes, value: Any):
+        blob = pickle.dumps(value)
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            old = db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (key, blob, len(blob), time.time()))
+            added, grown = (1, len(blob)) if old is None else (0, len(blob) - old[0])
+            db.execute("UPDATE meta SET count = count + ?, bytes = bytes + ?", (added, grown))
+            evicted = self._evict(db)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self._evictions += evicted
+
+    def _evict(self, db: sqlite3.Connection) -> int:
+        count, size = db.execute("SELECT count, bytes FROM meta").fetchone()
+        excess = 0 if self.max_entries is None else max(count - self.max_entries, 0)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Walk the oldest entries (through the index) only as far as needed to get under the limit.
+            freed, n = 0, 0
+            for (entry_size,) in db.execute("SELECT size FROM entries ORDER BY accessed"):
+                if n >= excess and size - freed <= self.max_bytes:
+                    break
+                freed, n = freed + entry_size, n + 1
+            excess = n
+        if not excess:
+            return 0
+        oldest = "SELECT key FROM entries ORDER BY accessed LIMIT ?"
+        (freed,) = db.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM entries WHERE key IN ({oldest})", (excess,)
+        ).fetchone()
+        db.execute(f"DELETE FROM entries WHERE key IN ({oldest})", (excess,))
+        db.execute("UPDATE meta SET count = count - ?, bytes = bytes - ?", (excess, freed))
+        return excess
+
+    def clear(self):
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        db.execute("DELETE FROM entries")
+        db.execute("UPDATE meta SET count = 0, bytes = 0")
+        db.execute("COMMIT")
+
+    def stats(self) -> CacheStats:
+        (size,) = self._connection().execute("SELECT count FROM meta").fetchone()
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, size)
+
+    def __len__(self) -> int:
+        return self.stats().size
+
+    def __getstate__(self):
+        return {"path": self.path, "max_entries": self.max_entries, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init()
+
+
+def _encode(x: Any) -> bytes:
+    """Canonical bytes for `x`: equal sets and dicts encode the same whatever their iteration order.
+
+    Tuples, lists, sets, frozensets and dicts are encoded recursively; anything else is pickled, so other
+    objects must pickle deterministically (not hold sets, say) for their keys to be stable across runs.
+    """
+    if isinstance(x, (set, frozenset)):
+        parts = sorted(_encode(e) for e in x)
+    elif isinstance(x, dict):
+        parts = sorted(_encode(k) + _encode(v) for k, v in x.items())
+    elif isinstance(x, (tuple, list)):
+        parts = [_encode(e) for e in x]
+    else:
+        blob = pickle.dumps(x)
+        return b"\x00" + len(blob).to_bytes(8) + blob
+    tag = type(x).__name__.encode()
+    body = b"".join(parts)
+    return len(tag).to_bytes(1) + tag + len(body).to_bytes(8) + body
+
+
+@dataclass(frozen=True)
+class ContentKey:
+    """x -> hash of a canonical encoding of the input, qualified by the stage `name` and `version`.
+
+    Bump `version` when the stage's code changes to invalidate its entries.
+
+    >>> ContentKey("f")({"b", "a"}) == ContentKey("f")({"a", "b"})
+    True
+    """
+
+    name: str
+    version: str = ""
+
+    def __call__(self, x: Any) -> bytes:
+        return hashlib.sha256(_encode((self.name, self.version, x))).digest()
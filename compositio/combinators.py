@@ -1,5 +1,14 @@
+import asyncio
+import collections
 import concurrent.futures
-from typing import Callable, Iterable, overload, Sequence
+import functools
+import inspect
+import itertools
+import multiprocessing
+import multiprocessing.context
+import os
+import time
+from typing import Any, Awaitable, Callable, Iterable, Iterator, cast, overload, Sequence
 
 
 def const[T](x: T) -> Callable[[object], T]:
@@ -81,33 +90,322 @@ def curry[A, B, R](f: Callable[[A, B], R]) -> Callable[[A], Callable[[B], R]]: .
 def curry[A, B, C, R](
     f: Callable[[A, B, C], R],
 ) -> Callable[[A], Callable[[B], Callable[[C], R]]]: ...
-def curry(f):  # no type here; types are handled by overloads
-    def _curried(*args, **kwargs):
-        if len(args) + len(kwargs) >= f.__code__.co_argcount:
-            return f(*args, **kwargs)
-        return lambda *more_args, **more_kwargs: _curried(*args, *more_args, **{**kwargs, **more_kwargs})
+@overload
+def curry(f: Callable[..., Any]) -> Callable[..., Any]: ...
+def curry(f: Callable[..., Any]) -> Any:  # precise types are handled by overloads
+    """Curry `f`: call it once all its required parameters are given, over one or more calls.
+
+    >>> add3 = curry(lambda a, b, c=0: a + b + c)
+    >>> add3(1)(2), add3(1, 2, 3), add3(1)(b=2)
+    (3, 6, 3)
+    >>> curry(lambda a, *, k: (a, k))(1)(k=2)
+    (1, 2)
+
+    Curried functions bind as methods.
+
+    >>> class Point:
+    ...     x = 1
+    ...     @curry
+    ...     def move(self, dx, dy):
+    ...         return (self.x + dx, dy)
+    >>> Point().move(1)(2)
+    (2, 2)
+    """
+    try:
+        params = inspect.signature(f).parameters.values()
+    except (TypeError, ValueError):  # no signature (some builtins): call it right away
+        params = []
+    positional = tuple(
+        p.name for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) and p.default is p.empty
+    )
+    kwonly = tuple(p.name for p in params if p.kind is p.KEYWORD_ONLY and p.default is p.empty)
+    return Curried(f, positional, kwonly)
+
+
+class Curried:
+    """A curried function. Partial applications are `functools.partial` objects over it, which flatten instead of
+    nesting, so arguments accumulate in one object whatever the number of steps."""
+
+    __slots__ = ("f", "positional", "kwonly", "arity")
 
-    return _curried
+    def __init__(self, f: Callable, positional: tuple[str, ...], kwonly: tuple[str, ...]):
+        self.f = f
+        self.positional = positional
+        self.kwonly = kwonly
+        self.arity = len(positional)
+
+    def __call__(self, *args, **kwargs):
+        if not (kwargs or self.kwonly):
+            if len(args) >= self.arity:
+                return self.f(*args)
+            return functools.partial(self, *args)
+        if all(n in kwargs for n in self.positional[len(args) :]) and all(n in kwargs for n in self.kwonly):
+            return self.f(*args, **kwargs)
+        return functools.partial(self, *args, **kwargs)
+
+    def __get__(self, obj, objtype=None):
+        return self if obj is None else functools.partial(self, obj)
+
+    def __repr__(self) -> str:
+        return f"curry({self.f!r})"
 
 
 def agg[A, B, C, D](f: Callable[[A], B], g: Callable[[C], D]) -> Callable[[tuple[A, C]], tuple[B, D]]:
     return lambda xy: (f(xy[0]), g(xy[1]))
 
 
-def mapc[I, O](f: Callable[[I], O], ls: Iterable[I], max_workers: int = 4) -> Iterable[O]:
-    """Concurrent map function with ThreadPoolExecutor"""
+def mapc[I, O](
+    f: Callable[[I], O],
+    ls: Iterable[I],
+    max_workers: int = 4,
+    window: int | None = None,
+    ordered: bool = True,
+    pool: concurrent.futures.Executor | None = None,
+) -> Iterator[O]:
+    """Lazy concurrent map function with ThreadPoolExecutor.
+
+    At most `window` (default `2 * max_workers`) tasks are in flight; the input is only pulled as results are
+    consumed. Results come in input order, or in completion order if `ordered` is False.
+
+    Tasks run on `pool` if given (e.g. `compositio.pool.shared()`), otherwise on a new executor that lives as
+    long as the iteration.
+
+    >>> list(mapc(lambda x: x + 1, [2, 3, 5, 7, 11]))
+    [3, 4, 6, 8, 12]
+    >>> list(itertools.islice(mapc(lambda x: x * 2, itertools.count()), 4))
+    [0, 2, 4, 6]
+    """
+    if pool is not None:
+        yield from windowed(pool, f, ls, window or 2 * max_workers, ordered)
+        return
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        return executor.map(f, ls)
+        yield from windowed(executor, f, ls, window or 2 * max_workers, ordered)
 
 
-def mapcm[I, O](f: Callable[[I], O], ls: Iterable[I], max_workers: int = 4) -> Iterable[O]:
+def mapcm[I, O](
+    f: Callable[[I], O], ls: Iterable[I], max_workers: int = 4, pool: concurrent.futures.Executor | None = None
+) -> Iterable[O]:
     """Maybe concurrent map function with ThreadPoolExecutor, if len(ls) > 1."""
     match ls:
         case list() if len(ls) < 2:
             return map(f, ls)
         case _:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                return executor.map(f, ls)
+            return mapc(f, ls, max_workers, pool=pool)
+
+
+def mapp[I, O](
+    f: Callable[[I], O],
+    ls: Iterable[I],
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+    min_items: int = 2,
+    executor: concurrent.futures.ProcessPoolExecutor | None = None,
+) -> Iterator[O]:
+    """Lazy parallel map function with ProcessPoolExecutor.
+
+    Items are sent to the workers in chunks, in input order. Unless `chunksize` is given, the chunk size adapts
+    so that each chunk takes about `CHUNK_SECONDS` of work, amortizing the per-item pickling overhead. Inputs
+    shorter than `min_items` are mapped in-process. `f` must be picklable.
+
+    >>> list(mapp(abs, [-2]))
+    [2]
+    """
+    it = iter(ls)
+    head = list(itertools.islice(it, min_items))
+    if len(head) < min_items:
+        yield from map(f, head)
+        return
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, mp_context=_mp_context()) as executor:
+            yield from mapp(f, itertools.chain(head, it), max_workers, chunksize, min_items, executor)
+        return
+
+    it = itertools.chain(head, it)
+    size = chunksize or 1
+
+    def chunks():
+        while chunk := list(itertools.islice(it, size)):
+            yield chunk
+
+    window = 2 * (max_workers or os.cpu_count() or 1)
+    for results, elapsed in windowed(executor, functools.partial(_timed_map, f), chunks(), window):
+        if chunksize is None:
+            size = max(1, min(2 * size, MAX_CHUNKSIZE, int(len(results) * CHUNK_SECONDS / max(elapsed, 1e-9))))
+        yield from results
+
+
+def reducep[I, O](
+    combine: Callable[[O, O], O],
+    empty: O,
+    ls: Iterable[I],
+    unit: Callable[[I], O] = i,
+    chunksize: int = 10_000,
+    max_workers: int | None = None,
+    executor: concurrent.futures.Executor | None = None,
+) -> O:
+    """Parallel reduce for an associative `combine` with identity `empty` (a monoid).
+
+    The input is read in chunks of `chunksize` items, each reduced on `executor` (default: a new process pool),
+    with at most `2 * max_workers` chunks in flight. Partial results are combined in a balanced tree, in input
+    order, as they arrive. `unit` maps an item to a monoid value.
+
+    >>> import operator
+    >>> reducep(operator.add, "", "abcdefg", chunksize=2, executor=concurrent.futures.ThreadPoolExecutor())
+    'abcdefg'
+    """
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, mp_context=_mp_context()) as executor:
+            return reducep(combine, empty, ls, unit, chunksize, max_workers, executor)
+
+    it = iter(ls)
+
+    def chunks():
+        while chunk := list(itertools.islice(it, chunksize)):
+            yield chunk
+
+    window = 2 * (max_workers or os.cpu_count() or 1)
+    # Partial results with the height of their subtree; equal heights are merged, like carries in a binary counter.
+    stack: list[tuple[int, O]] = []
+    for partial in windowed(executor, functools.partial(_reduce_chunk, combine, empty, unit), chunks(), window):
+        height = 0
+        while stack and stack[-1][0] == height:
+            partial = combine(stack.pop()[1], partial)
+            height += 1
+        stack.append((height, partial))
+    return functools.reduce(combine, (partial for _, partial in stack), empty)
+
+
+def _reduce_chunk[I, O](combine: Callable[[O, O], O], empty: O, unit: Callable[[I], O], chunk: list[I]) -> O:
+    # With the identity as unit, the inputs already are values of the monoid.
+    return functools.reduce(combine, cast(list[O], chunk) if unit is i else map(unit, chunk), empty)
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """Avoid fork: the caller may be running pool threads, which a forked child would inherit in a broken state."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+CHUNK_SECONDS = 0.02
+MAX_CHUNKSIZE = 8192
+
+
+def _timed_map[I, O](f: Callable[[I], O], chunk: list[I]) -> tuple[list[O], float]:
+    start = time.perf_counter()
+    return [f(x) for x in chunk], time.perf_counter() - start
+
+
+def windowed[I, O](
+    executor: concurrent.futures.Executor, f: Callable[[I], O], ls: Iterable[I], window: int, ordered: bool = True
+) -> Iterator[O]:
+    """Map `f` over `ls` on `executor`, keeping at most `window` tasks in flight.
+
+    Pending tasks are cancelled if the consumer stops early.
+    """
+    it = iter(ls)
+    pending = collections.deque(executor.submit(f, x) for x in itertools.islice(it, window))
+    try:
+        if ordered:
+            while pending:
+                fut = pending.popleft()
+                for x in itertools.islice(it, 1):
+                    pending.append(executor.submit(f, x))
+                yield fut.result()
+        else:
+            while pending:
+                done, rest = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                pending = collections.deque(rest)
+                pending.extend(executor.submit(f, x) for x in itertools.islice(it, len(done)))
+                for fut in done:
+                    yield fut.result()
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
+def traversec[I, O](
+    f: Callable[[I], O],
+    ls: Iterable[I],
+    failed: Callable[[O], bool],
+    max_workers: int = 4,
+    window: int | None = None,
+    pool: concurrent.futures.Executor | None = None,
+) -> tuple[list[O], O | None]:
+    """Concurrent map that stops at the first result for which `failed` is true.
+
+    Returns the results in input order and None, or [] and the first failure (in completion order). On failure,
+    calls not yet started are cancelled and no more input is pulled, so at most `window` (default
+    `2 * max_workers`) calls are wasted.
+    """
+    if pool is not None:
+        return _traversec(pool, f, ls, failed, window or 2 * max_workers)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return _traversec(executor, f, ls, failed, window or 2 * max_workers)
+
+
+def _traversec[I, O](
+    executor: concurrent.futures.Executor,
+    f: Callable[[I], O],
+    ls: Iterable[I],
+    failed: Callable[[O], bool],
+    window: int,
+) -> tuple[list[O], O | None]:
+    it = enumerate(ls)
+    pending: dict[concurrent.futures.Future[O], int] = {}
+    results: dict[int, O] = {}
+
+    def submit(n: int):
+        for i, x in itertools.islice(it, n):
+            pending[executor.submit(f, x)] = i
+
+    submit(window)
+    try:
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for fut in done:
+                i = pending.pop(fut)
+                y = fut.result()
+                if failed(y):
+                    return [], y
+                results[i] = y
+            submit(len(done))
+        return [results[i] for i in range(len(results))], None
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
+async def atraversec[I, O](
+    f: Callable[[I], Awaitable[O]], ls: Iterable[I], failed: Callable[[O], bool], limit: int = 64
+) -> tuple[list[O], O | None]:
+    """Asyncio version of `traversec`, with at most `limit` calls of the coroutine function `f` in flight.
+
+    On failure, pending calls are cancelled.
+    """
+    it = enumerate(ls)
+    pending: dict[asyncio.Future[O], int] = {}
+    results: dict[int, O] = {}
+
+    def submit(n: int):
+        for i, x in itertools.islice(it, n):
+            pending[asyncio.ensure_future(f(x))] = i
+
+    submit(limit)
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                i = pending.pop(fut)
+                y = fut.result()
+                if failed(y):
+                    return [], y
+                results[i] = y
+            submit(len(done))
+        return [results[i] for i in range(len(results))], None
+    finally:
+        for fut in pending:
+            fut.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
 
 
 def until[I](pred: Callable[[I], bool], func: Callable[[I], I], val: I):
@@ -0,0 +1,312 @@
+"""Stage nodes of the arrow graph.
+
+Arrows are built from these plain, frozen dataclasses instead of local closures, so a composed pipeline can be
+inspected and pickled (as long as the functions it wraps can be), e.g. to ship it to worker processes.
+"""
+
+import concurrent.futures
+import functools
+import itertools
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Sequence
+
+import compositio.combinators as Comb
+import compositio.pool as Pool
+from compositio.monoid import Monoid
+from compositio.result import Err, Ok, Result
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+if TYPE_CHECKING:
+    from numpy import ndarray
+
+
+@dataclass(frozen=True)
+class Split[A, B, C, D]:
+    """(***) (x, y) -> (f x, g y)"""
+
+    f: Callable[[A], B]
+    g: Callable[[C], D]
+
+    def __call__(self, xy: tuple[A, C]) -> tuple[B, D]:
+        return (self.f(xy[0]), self.g(xy[1]))
+
+
+@dataclass(frozen=True)
+class Fanout[A, B, C]:
+    """(&&&) x -> (f x, g x)"""
+
+    f: Callable[[A], B]
+    g: Callable[[A], C]
+
+    def __call__(self, x: A) -> tuple[B, C]:
+        return (self.f(x), self.g(x))
+
+
+@dataclass(frozen=True)
+class Choice[A, B, C, D]:
+    """(+++) Ok x -> Ok (f x), Err e -> Err (g e)"""
+
+    f: Callable[[A], B]
+    g: Callable[[C], D]
+
+    def __call__(self, r: Result[A, C]) -> Result[B, D]:
+        return r.bimap(self.f, self.g)
+
+
+@dataclass(frozen=True)
+class Fanin[A, B, C]:
+    """(|||) Ok x -> f x, Err e -> g e"""
+
+    f: Callable[[A], B]
+    g: Callable[[C], B]
+
+    def __call__(self, r: Result[A, C]) -> B:
+        return r.either(self.f, self.g)
+
+
+@dataclass(frozen=True)
+class Partitioned[A, B, C, D]:
+    """rs -> Choice (or Fanin) over rs, with f and g each called once with all the values of their branch."""
+
+    f: Callable[[list[A]], Iterable[B]]
+    g: Callable[[list[C]], Iterable[D]]
+    fanin: bool = False
+
+    def __call__(self, rs: Iterable[Result[A, C]]) -> list[Any]:
+        rs = list(rs)
+        oks = [r.value for r in rs if type(r) is Ok]
+        errs = [r.error for r in rs if type(r) is Err]
+        bs = iter(self.f(oks) if oks else ())
+        ds = iter(self.g(errs) if errs else ())
+        if self.fanin:
+            return [next(bs) if type(r) is Ok else next(ds) for r in rs]
+        return [Ok(next(bs)) if type(r) is Ok else Err(next(ds)) for r in rs]
+
+
+@dataclass(frozen=True)
+class ConcurrentSplit[A, B, C, D]:
+    """(***) (x, y) -> (f x, g y), with g on a thread pool"""
+
+    f: Callable[[A], B]
+    g: Callable[[C], D]
+    pool: concurrent.futures.Executor | None = None
+
+    def __call__(self, xy: tuple[A, C]) -> tuple[B, D]:
+        return _both(self.pool, self.f, xy[0], self.g, xy[1])
+
+
+@dataclass(frozen=True)
+class ConcurrentFanout[A, B, C]:
+    """(&&&) x -> (f x, g x), with g on a thread pool"""
+
+    f: Callable[[A], B]
+    g: Callable[[A], C]
+    pool: concurrent.futures.Executor | None = None
+
+    def __call__(self, x: A) -> tuple[B, C]:
+        return _both(self.pool, self.f, x, self.g, x)
+
+
+def _both[A, B, C, D](
+    pool: concurrent.futures.Executor | None, f: Callable[[A], B], x: A, g: Callable[[C], D], y: C
+) -> tuple[B, D]:
+    """(f x, g y), running g on `pool` (default: the shared pool) while f runs on the calling thread.
+
+    Both calls always finish; if both raise, the exception of f wins. When the calling thread is itself a worker
+    of `pool`, g runs inline after f: every worker could be waiting on a branch like this one.
+    """
+    pool = pool or Pool.shared()
+    if isinstance(pool, Pool.Pool) and pool.in_worker():
+        return (f(x), g(y))
+    fut = pool.submit(g, y)
+    try:
+        b = f(x)
+    finally:
+        concurrent.futures.wait([fut])
+    return (b, fut.result())
+
+
+@dataclass(frozen=True)
+class Map[I, O]:
+    """xs -> map(f, xs)"""
+
+    f: Callable[[I], O]
+
+    def __call__(self, xs: Iterable[I]) -> Iterable[O]:
+        return map(self.f, xs)
+
+
+@dataclass(frozen=True)
+class Filter[I]:
+    """xs -> filter(f, xs)"""
+
+    f: Callable[[I], object]
+
+    def __call__(self, xs: Iterable[I]) -> Iterable[I]:
+        return filter(self.f, xs)
+
+
+@dataclass(frozen=True)
+class FlatMap[I, O]:
+    """xs -> (y for x in xs for y in f(x))"""
+
+    f: Callable[[I], Iterable[O]]
+
+    def __call__(self, xs: Iterable[I]) -> Iterable[O]:
+        return itertools.chain.from_iterable(map(self.f, xs))
+
+
+def fuse(stages: tuple[Callable[[Any], Any], ...]) -> tuple[Callable[[Any], Any], ...]:
+    """Replace each run of two or more adjacent Map, Filter and FlatMap stages with a single comprehension.
+
+    A `list` or `tuple` stage right after a run is built by the comprehension directly.
+
+    >>> (fused,) = fuse((Map(abs), Filter(bool), FlatMap(range), list))
+    >>> fused([-2, 0, 3])
+    [0, 1, 0, 1, 2]
+    """
+    result: list[Callable[[Any], Any]] = []
+    run: list[Map | Filter | FlatMap] = []
+    for stage in stages + (None,):
+        if isinstance(stage, (Map, Filter, FlatMap)):
+            run.append(stage)
+            continue
+        if len(run) < 2:
+            result.extend(run)
+        elif stage is list or stage is tuple:
+            result.append(_loop(run, list if stage is list else tuple))
+            run = []
+            continue
+        else:
+            result.append(_loop(run, None))
+        run = []
+        if stage is not None:
+            result.append(stage)
+    return tuple(result)
+
+
+def _loop(run: list["Map | Filter | FlatMap"], sink: type[list] | type[tuple] | None) -> Callable[[Any], Any]:
+    """Generate one comprehension running the stages of `run`, building the `sink` or else a generator.
+
+    E.g. Map, Filter, FlatMap, Map -> `[v3 for x in xs for v0 in (f0(x),) if f1(v1 := v0) for v2 in f2(v1) for v3 in (f3(v2),)]`
+
+    Each step binds its own variable, so the nesting of the generated code stays constant however long the run.
+    """
+    value = "x"
+    clauses = ["for x in xs"]
+    for i, stage in enumerate(run):
+        match stage:
+            case Map():
+                clauses.append(f"for v{i} in (f{i}({value}),)")
+                value = f"v{i}"
+            case Filter():
+                clauses.append(f"if f{i}(v{i} := {value})")
+                value = f"v{i}"
+            case FlatMap():
+                clauses.append(f"for v{i} in f{i}({value})")
+                value = f"v{i}"
+    comprehension = f"{value} {' '.join(clauses)}"
+    match sink:
+        case None:
+            body = f"({comprehension})"
+        case _ if sink is list:
+            body = f"[{comprehension}]"
+        case _:
+            body = f"tuple({comprehension})"
+    namespace = {f"f{i}": stage.f for i, stage in enumerate(run)}
+    exec(f"def fused(xs):\n    return {body}", namespace)  # pylint: disable=exec-used
+    return namespace["fused"]
+
+
+@dataclass(frozen=True)
+class ConcurrentMap[I, O]:
+    """xs -> mapc(f, xs)"""
+
+    f: Callable[[I], O]
+    max_workers: int = 4
+    window: int | None = None
+    ordered: bool = True
+    pool: concurrent.futures.Executor | None = None
+
+    def __call__(self, xs: Iterable[I]) -> Iterable[O]:
+        return Comb.mapc(self.f, xs, self.max_workers, self.window, self.ordered, self.pool)
+
+
+@dataclass(frozen=True)
+class ProcessMap[I, O]:
+    """xs -> mapp(f, xs)"""
+
+    f: Callable[[I], O]
+    max_workers: int | None = None
+    chunksize: int | None = None
+    min_items: int = 2
+
+    def __call__(self, xs: Iterable[I]) -> Iterable[O]:
+        return Comb.mapp(self.f, xs, self.max_workers, self.chunksize, self.min_items)
+
+
+@dataclass(frozen=True)
+class Reduce[I, O]:
+    """xs -> reduce(f, xs, z)"""
+
+    f: Callable[[O, I], O]
+    z: O
+
+    def __call__(self, xs: Iterable[I]) -> O:
+        return functools.reduce(self.f, xs, self.z)
+
+
+@dataclass(frozen=True)
+class Lift[I, O]:
+    """Element-wise application of a scalar function over a chunk."""
+
+    f: Callable[[I], O]
+
+    def __call__(self, xs: "Sequence[I] | ndarray") -> "Sequence[O] | ndarray":
+        ys = list(map(self.f, xs))
+        if np is not None and isinstance(xs, np.ndarray):
+            return np.array(ys)
+        return ys
+
+
+@dataclass(frozen=True)
+class Batched[I, O]:
+    """xs -> f applied once per chunk of `size` elements, flattened."""
+
+    f: Callable[[Sequence[I]], Sequence[O]]
+    size: int = 1024
+
+    def __call__(self, xs: "Iterable[I] | ndarray") -> "Iterable[O] | ndarray":
+        if np is not None and isinstance(xs, np.ndarray):
+            f: Callable[[Any], Any] = self.f  # batch functions take arrays too
+            if len(xs) <= self.size:
+                return f(xs)
+            return np.concatenate([f(xs[i : i + self.size]) for i in range(0, len(xs), self.size)])
+        return self._chunks(iter(xs))
+
+    def _chunks(self, it: Iterable[I]) -> Iterable[O]:
+        while chunk := list(itertools.islice(it, self.size)):
+            yield from self.f(chunk)
+
+
+@dataclass(frozen=True)
+class ParallelReduce[I, O]:
+    """xs -> reducep(monoid, xs)"""
+
+    monoid: Monoid[O, I]
+    chunksize: int = 10_000
+    max_workers: int | None = None
+    executor: concurrent.futures.Executor | None = None
+
+    def __call__(self, xs: Iterable[I]) -> O:
+        m = self.monoid
+        return Comb.reducep(m.combine, m.empty, xs, m.unit, self.chunksize, self.max_workers, self.executor)
+
+
+def name(stage: Callable[[Any], Any]) -> str:
+    """Human readable name of a stage."""
+    return getattr(stage, "__qualname__", None) or repr(stage)
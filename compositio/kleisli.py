@@ -0,0 +1,71 @@
+"""Kleisli arrows: composition of functions returning `Maybe` or `Result`.
+
+`Kleisli(f) >> g >> h` is the function `x -> f(x) @ g @ h`, but it unwraps each `Just`/`Ok` in a single loop
+and returns the first `Nothing`/`Err` as is, without calling the remaining stages or allocating any wrapper.
+
+>>> from compositio.maybe import just, nothing
+>>> half = Kleisli(lambda x: just(x // 2) if x % 2 == 0 else nothing())
+>>> quarter = half >> half
+>>> quarter(8), quarter(6)
+(Just(2), Nothing())
+
+Kleisli arrows are arrows, so they plug into `mapa`, `mapca`, etc.
+
+>>> from compositio.arrows import mapa
+>>> [8, 6] | mapa(quarter) >> list
+[Just(2), Nothing()]
+"""
+
+from typing import Any, Callable
+
+import compositio.ir as IR
+from compositio.arrows import Arrow
+from compositio.maybe import Just, Maybe, Nothing
+from compositio.result import Err, Ok, Result
+
+
+class Kleisli[A, B](Arrow[A, Maybe[B] | Result[B, Any]]):
+    """Arrow whose stages return `Maybe` or `Result`. Functions composed with `>>` are treated as such stages.
+
+    A stage returning anything else raises TypeError: lift plain functions explicitly.
+
+    >>> from compositio.maybe import just
+    >>> half = Kleisli(lambda x: just(x // 2))
+    >>> (int >> half)("8")
+    Traceback (most recent call last):
+    ...
+    TypeError: Kleisli stage int returned int, expected a Maybe or a Result
+    >>> ((lambda s: just(int(s))) >> half)("8")
+    Just(4)
+    """
+
+    @staticmethod
+    def _compile(stages: tuple[Callable[[Any], Any], ...]) -> Callable[[Any], Any]:
+        def run(x):
+            r = None
+            for f in stages:
+                r = f(x)
+                t = type(r)
+                if t is Just or t is Ok:
+                    x = r.value
+                elif t is Nothing or t is Err:
+                    return r
+                else:
+                    raise TypeError(f"Kleisli stage {IR.name(f)} returned {t.__name__}, expected a Maybe or a Result")
+            return r
+
+        return run
+
+    def __rrshift__[C](  # type: ignore[override]
+        self, other: Callable[[C], Maybe[A] | Result[A, Any]]
+    ) -> "Kleisli[C, B]":
+        return Kleisli._of(_stages(other) + self.stages)
+
+    def __rshift__[C](  # type: ignore[override]
+        self, other: Callable[[B], Maybe[C] | Result[C, Any]]
+    ) -> "Kleisli[A, C]":
+        return Kleisli._of(self.stages + _stages(other))
+
+
+def _stages(other: Callable[[Any], Any]) -> tuple[Callable[[Any], Any], ...]:
+    return other.stages if isinstance(other, Kleisli) else (other,)
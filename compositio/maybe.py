@@ -1,66 +1,158 @@
-from dataclasses import dataclass
-from typing import Callable, Literal, Sequence
+import abc
+import concurrent.futures
+from typing import Any, Awaitable, Callable, Iterable, Literal, Sequence, cast
 
 import compositio.combinators as C
 
 
-@dataclass(eq=True, frozen=True)
-class Maybe[T]:
-    val: tuple[Literal["Just"], T] | None
+class Maybe[T](abc.ABC):
+    """Either `Just(value)` or the `Nothing()` singleton.
+
+    >>> just(1).map(lambda x: x + 1)
+    Just(2)
+    >>> nothing().map(lambda x: x + 1) is nothing()
+    True
+    >>> match just(1):
+    ...     case Just(v):
+    ...         v
+    1
+    """
+
+    __slots__ = ()
+    __match_args__ = ("val",)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"cannot assign to field {name!r}")
+
+    @property
+    @abc.abstractmethod
+    def val(self) -> tuple[Literal["Just"], T] | None:
+        """Tagged value of earlier versions."""
+
+    @abc.abstractmethod
+    def map[B](self, f: Callable[[T], B]) -> "Maybe[B]": ...
+
+    __rtruediv__ = map
+
+    @abc.abstractmethod
+    def apply[B](self, f: "Maybe[Callable[[T], B]]") -> "Maybe[B]": ...
+
+    @abc.abstractmethod
+    def bind[B](self, f: Callable[[T], "Maybe[B]"]) -> "Maybe[B]": ...
+
+    __matmul__ = bind
+
+    @abc.abstractmethod
+    def maybe[B](self, nothing: B, otherwise: Callable[[T], B]) -> B: ...
+
+
+class Just[T](Maybe[T]):
+    __slots__ = ("value",)
+    __match_args__ = ("value",)
+
+    value: T
+
+    def __init__(self, value: T):
+        _set_value(self, value)
+
+    @property
+    def val(self) -> tuple[Literal["Just"], T]:
+        """Tagged tuple of earlier versions."""
+        return ("Just", self.value)
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is Just and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash((Just, self.value))
+
+    def __repr__(self) -> str:
+        return f"Just({self.value!r})"
+
+    def __reduce__(self):
+        return (Just, (self.value,))
 
     def map[B](self, f: Callable[[T], B]) -> "Maybe[B]":
-        match self.val:
-            case ("Just", v):
-                return just(f(v))
-            case None:
-                return nothing()
+        return Just(f(self.value))
 
     __rtruediv__ = map
 
     def apply[B](self, f: "Maybe[Callable[[T], B]]") -> "Maybe[B]":
-        match self.val, f.val:
-            case ("Just", v), ("Just", vf):
-                return just(vf(v))
-            case _, _:
-                return nothing()
-
-    # __rmod__ = apply  # TODO not working (TypeError at runtime... why?)
+        if type(f) is Just:
+            return Just(f.value(self.value))
+        return NOTHING
 
     def bind[B](self, f: Callable[[T], "Maybe[B]"]) -> "Maybe[B]":
-        match self.val:
-            case ("Just", v):
-                return f(v)
-            case None:
-                return nothing()
+        return f(self.value)
 
     __matmul__ = bind
 
     def maybe[B](self, nothing: B, otherwise: Callable[[T], B]) -> B:
-        match self.val:
-            case ("Just", v):
-                return otherwise(v)
-            case None:
-                return nothing
+        return otherwise(self.value)
+
+
+_set_value = Just.value.__set__  # type: ignore[attr-defined]
+
+
+class Nothing(Maybe[Any]):
+    """The absence of a value. `Nothing()` always returns the same instance."""
+
+    __slots__ = ()
+
+    _instance: "Nothing | None" = None
+
+    def __new__(cls) -> "Nothing":
+        if Nothing._instance is None:
+            Nothing._instance = super().__new__(cls)
+        return Nothing._instance
+
+    @property
+    def val(self) -> None:
+        """Tagged value of earlier versions."""
+        return None
+
+    def __repr__(self) -> str:
+        return "Nothing()"
+
+    def __reduce__(self):
+        return (Nothing, ())
+
+    def map[B](self, f: Callable[[Any], B]) -> "Maybe[B]":
+        return self
+
+    __rtruediv__ = map
+
+    def apply[B](self, f: "Maybe[Callable[[Any], B]]") -> "Maybe[B]":
+        return self
+
+    def bind[B](self, f: Callable[[Any], "Maybe[B]"]) -> "Maybe[B]":
+        return self
+
+    __matmul__ = bind
+
+    def maybe[B](self, nothing: B, otherwise: Callable[[Any], B]) -> B:
+        return nothing
+
+
+NOTHING = Nothing()
 
 
 def both[A, B](a: Maybe[A], b: Maybe[B]) -> Maybe[tuple[A, B]]:
-    match a.val, b.val:
-        case ("Just", v1), ("Just", v2):
-            return just((v1, v2))
-        case _, _:
-            return nothing()
+    if type(a) is Just and type(b) is Just:
+        return Just((a.value, b.value))
+    return NOTHING
 
 
 def just[T](val: T) -> Maybe[T]:
-    return Maybe(("Just", val))
+    return Just(val)
 
 
-def nothing():
-    return Maybe(None)
+def nothing() -> Maybe[Any]:
+    return NOTHING
 
 
 def from_optional[T](val: T | None) -> Maybe[T]:
-    return just(val) if val is not None else nothing()
+    return Just(val) if val is not None else NOTHING
 
 
 def maybe_none[I, O](none: O, otherwise: Callable[[I], O], val: I | None) -> O:
@@ -69,28 +161,57 @@ def maybe_none[I, O](none: O, otherwise: Callable[[I], O], val: I | None) -> O:
 
 def map_maybe[A, B](f: Callable[[A], Maybe[B]], ls: Sequence[A]) -> Sequence[B]:
     """A map that throws out elements for which `f` returns Nothing."""
-
-    def to_list[T](m: Maybe[T]) -> list[T]:
-        return m.maybe([], lambda v: [v])
-
-    return [r for x in ls for r in to_list(f(x))]
+    return [m.value for x in ls if type(m := f(x)) is Just]
 
 
 def cat_maybes[A](ls: Sequence[Maybe[A]]) -> Sequence[A]:
     return map_maybe(C.i, ls)
 
 
-def traverse[A, B](f: Callable[[A], Maybe[B]], seq: Sequence[A]) -> Maybe[Sequence[B]]:
+def traverse[A, B](f: Callable[[A], Maybe[B]], seq: Iterable[A]) -> Maybe[Sequence[B]]:
+    """Just the results of `f`, or Nothing as soon as `f` returns Nothing, without consuming the rest of `seq`.
+
+    >>> import itertools
+    >>> traverse(lambda x: nothing() if x > 2 else just(x), itertools.count())
+    Nothing()
+    """
     result: list[B] = []
     for x in seq:
         mb = f(x)
-        match mb.val:
-            case None:
-                return nothing()
-            case ("Just", v):
-                result.append(v)
-    return just(result)
+        if type(mb) is not Just:
+            return NOTHING
+        result.append(mb.value)
+    return Just(result)
+
+
+def _failed(m: Maybe[Any]) -> bool:
+    return type(m) is not Just
+
+
+def traversec[A, B](
+    f: Callable[[A], Maybe[B]],
+    seq: Iterable[A],
+    max_workers: int = 4,
+    window: int | None = None,
+    pool: concurrent.futures.Executor | None = None,
+) -> Maybe[Sequence[B]]:
+    """Concurrent `traverse` on a thread pool, stopping (and cancelling pending calls) at the first Nothing.
+
+    >>> traversec(lambda x: just(x * 2), [1, 2, 3])
+    Just([2, 4, 6])
+    """
+    values, failure = C.traversec(f, seq, _failed, max_workers, window, pool)
+    # Every value passed `_failed`, so it is a Just.
+    return NOTHING if failure is not None else Just([m.value for m in cast(list[Just[B]], values)])
+
+
+async def atraversec[A, B](
+    f: Callable[[A], Awaitable[Maybe[B]]], seq: Iterable[A], limit: int = 64
+) -> Maybe[Sequence[B]]:
+    """Concurrent `traverse` with a coroutine function, stopping (and cancelling pending calls) at the first Nothing."""
+    values, failure = await C.atraversec(f, seq, _failed, limit)
+    return NOTHING if failure is not None else Just([m.value for m in cast(list[Just[B]], values)])
 
 
-def sequence[A](lst: Sequence[Maybe[A]]) -> Maybe[Sequence[A]]:
+def sequence[A](lst: Iterable[Maybe[A]]) -> Maybe[Sequence[A]]:
     return traverse(C.i, lst)
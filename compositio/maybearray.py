@@ -0,0 +1,128 @@
+"""Columnar storage for many `Maybe` values.
+
+A `MaybeArray` keeps the values in one buffer (a list, an `array.array` or a NumPy array) next to a validity
+mask with one byte per slot (`1` for Just), instead of one `Maybe` object per value. Bulk operations then run
+over the buffers: `cat_maybes` is an `itertools.compress` (or a boolean index with NumPy), and `map` can hand
+the whole buffer to a NumPy ufunc.
+
+>>> xs = MaybeArray.from_optionals([1, None, 3])
+>>> xs.map(lambda x: x * 10).cat_maybes()
+[10, 30]
+>>> xs.to_maybes()
+[Just(1), Nothing(), Just(3)]
+>>> xs.sequence()
+Nothing()
+"""
+
+import array
+import itertools
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Sequence, cast
+
+from compositio.maybe import NOTHING, Just, Maybe
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+if TYPE_CHECKING:
+    from numpy import ndarray
+
+
+class MaybeArray[T]:
+    """`values` with a validity mask; the value of an invalid (Nothing) slot is a placeholder."""
+
+    __slots__ = ("values", "valid")
+
+    values: Sequence[T]
+    valid: "bytearray | ndarray"
+
+    def __init__(self, values: Sequence[T], valid: "bytearray | ndarray | None" = None):
+        self.values = values
+        if valid is None:
+            if np is not None and isinstance(values, np.ndarray):
+                valid = np.ones(len(values), dtype=bool)
+            else:
+                valid = bytearray(b"\1" * len(values))
+        if len(valid) != len(values):
+            raise ValueError(f"{len(values)} values but {len(valid)} validity flags")
+        self.valid = valid
+
+    @classmethod
+    def from_optionals(cls, xs: Iterable[T | None], typecode: str | None = None) -> "MaybeArray[T]":
+        """From values where None means Nothing, stored in an `array.array(typecode)` if given."""
+        xs = list(xs)
+        valid = bytearray(x is not None for x in xs)
+        if typecode is None:
+            return cls(cast(list[T], xs), valid)
+        filled: list[Any] = [0 if x is None else x for x in xs]
+        return cls(cast(Sequence[T], array.array(typecode, filled)), valid)
+
+    @classmethod
+    def from_maybes(cls, ms: Iterable[Maybe[T]], typecode: str | None = None) -> "MaybeArray[T]":
+        ms = list(ms)
+        values = [m.value if isinstance(m, Just) else None for m in ms]
+        valid = bytearray(type(m) is Just for m in ms)
+        if typecode is None:
+            return cls(cast(list[T], values), valid)
+        filled: list[Any] = [0 if v is None else v for v in values]
+        return cls(cast(Sequence[T], array.array(typecode, filled)), valid)
+
+    def to_optionals(self) -> list[T | None]:
+        return [v if ok else None for v, ok in zip(self.values, self.valid)]
+
+    def to_maybes(self) -> list[Maybe[T]]:
+        return [Just(v) if ok else NOTHING for v, ok in zip(self.values, self.valid)]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, i: int) -> Maybe[T]:
+        return Just(self.values[i]) if self.valid[i] else NOTHING
+
+    def __iter__(self) -> Iterator[Maybe[T]]:
+        return iter(self.to_maybes())
+
+    def __eq__(self, other: object) -> bool:
+        match other:
+            case MaybeArray():
+                return self.to_optionals() == other.to_optionals() and list(self.valid) == list(other.valid)
+            case _:
+                return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MaybeArray({self.to_maybes()!r})"
+
+    def map[B](self, f: Callable[[T], B], vectorized: bool = False) -> "MaybeArray[B]":
+        """Apply `f` to every Just value.
+
+        With `vectorized`, `f` is called once with the whole buffer (e.g. a NumPy ufunc), placeholders included.
+        """
+        if vectorized:
+            return MaybeArray(cast(Callable[[Sequence[T]], Sequence[B]], f)(self.values), self.valid)
+        values = [f(v) if ok else None for v, ok in zip(self.values, self.valid)]
+        return MaybeArray(cast(list[B], values), self.valid)
+
+    def bind[B](self, f: Callable[[T], Maybe[B]]) -> "MaybeArray[B]":
+        values: list[Any] = []
+        valid = bytearray(len(self.values))
+        for i, (v, ok) in enumerate(zip(self.values, self.valid)):
+            m = f(v) if ok else NOTHING
+            if type(m) is Just:
+                values.append(m.value)
+                valid[i] = 1
+            else:
+                values.append(None)
+        return MaybeArray(values, valid)
+
+    def cat_maybes(self) -> Sequence[T]:
+        """The Just values."""
+        if np is not None and isinstance(self.values, np.ndarray):
+            return cast(Sequence[T], np.compress(np.asarray(self.valid, dtype=bool), self.values))
+        return list(itertools.compress(self.values, self.valid))
+
+    def sequence(self) -> Maybe[Sequence[T]]:
+        """Just all the values, or Nothing if any is missing."""
+        if np is not None and isinstance(self.valid, np.ndarray):
+            return Just(self.values) if self.valid.all() else NOTHING
+        return NOTHING if 0 in self.valid else Just(list(self.values))
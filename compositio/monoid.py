@@ -0,0 +1,66 @@
+"""Monoids: an identity (`empty`) and an associative `combine`.
+
+`unit` turns a single entry into a value of the monoid, e.g. for `writer.tell`. All built-in monoids are made of
+module level functions, so they pickle.
+
+>>> functools.reduce(SUM.combine, map(SUM.unit, [1, 2, 3]), SUM.empty)
+6
+>>> H = histogram([0, 10])
+>>> functools.reduce(H.combine, map(H.unit, [-5, 3, 7, 42]), H.empty)
+(1, 2, 1)
+"""
+
+import bisect
+import collections
+import functools
+import operator
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Protocol, Sequence, cast
+
+import compositio.combinators as C
+
+
+@dataclass(frozen=True)
+class Monoid[M, W]:
+    empty: M
+    combine: Callable[[M, M], M]
+    unit: Callable[[W], M] = cast(Callable[[Any], Any], C.i)
+
+
+class _Ordered(Protocol):
+    def __lt__(self, other: Any, /) -> bool: ...
+
+
+def _min[T: _Ordered](a: T | None, b: T | None) -> T | None:
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _max[T: _Ordered](a: T | None, b: T | None) -> T | None:
+    return b if a is None else a if b is None else max(a, b)
+
+
+def _count[T: Hashable](w: T) -> collections.Counter[T]:
+    return collections.Counter((w,))
+
+
+def _add_counts(a: tuple[int, ...], b: tuple[int, ...]) -> tuple[int, ...]:
+    return tuple(map(operator.add, a, b))
+
+
+def _bucket(edges: Sequence[float], w: float) -> tuple[int, ...]:
+    counts = [0] * (len(edges) + 1)
+    counts[bisect.bisect_right(edges, w)] = 1
+    return tuple(counts)
+
+
+SUM: Monoid[float, float] = Monoid(0, operator.add)
+PRODUCT: Monoid[float, float] = Monoid(1, operator.mul)
+MIN: Monoid[Any, Any] = Monoid(None, _min)
+MAX: Monoid[Any, Any] = Monoid(None, _max)
+COUNTER: Monoid[collections.Counter, Hashable] = Monoid(collections.Counter(), operator.add, _count)
+
+
+def histogram(edges: Sequence[float]) -> Monoid[tuple[int, ...], float]:
+    """Counts of entries per bucket: `(-inf, edges[0])`, `[edges[0], edges[1])`, ..., `[edges[-1], inf)`."""
+    edges = tuple(sorted(edges))
+    return Monoid((0,) * (len(edges) + 1), _add_counts, functools.partial(_bucket, edges))
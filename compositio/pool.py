@@ -0,0 +1,109 @@
+"""Shared thread pool with utilization metrics.
+
+A `Pool` can be passed to `combinators.mapc`, `combinators.mapcm` and `arrows.mapca` (or anything taking a
+`concurrent.futures.Executor`) so that the threads are reused across calls instead of created per call.
+"""
+
+import atexit
+import concurrent.futures
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    queue_depth: int
+    """Tasks submitted but not started."""
+    active: int
+    """Tasks running."""
+    completed: int
+    """Tasks finished, successfully or not."""
+    mean_wait: float
+    """Mean time, in seconds, tasks waited in the queue before starting."""
+
+
+def default_size() -> int:
+    """Number of workers: `COMPOSITIO_MAX_WORKERS` if set, else ThreadPoolExecutor's CPU based default."""
+    return int(os.environ.get("COMPOSITIO_MAX_WORKERS", 0)) or min(32, (os.cpu_count() or 1) + 4)
+
+
+class Pool(concurrent.futures.Executor):
+    """ThreadPoolExecutor that keeps utilization counters.
+
+    >>> with Pool(max_workers=2) as pool:
+    ...     list(pool.map(abs, [-1, -2, 3]))
+    ...     pool.stats().completed
+    [1, 2, 3]
+    3
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers or default_size()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._waited = 0.0
+        self._started = 0
+        self._local = threading.local()
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> concurrent.futures.Future:
+        with self._lock:
+            self._queued += 1
+        fut = self._executor.submit(self._run, time.perf_counter(), fn, args, kwargs)
+        fut.add_done_callback(self._on_done)
+        return fut
+
+    def _run(self, submitted: float, fn: Callable, args: tuple, kwargs: dict):
+        started = time.perf_counter()
+        self._local.worker = True
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._started += 1
+            self._waited += started - submitted
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    def _on_done(self, fut: concurrent.futures.Future):
+        if fut.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def in_worker(self) -> bool:
+        """Whether the calling thread is one of this pool's workers, where blocking on the pool can deadlock."""
+        return getattr(self._local, "worker", False)
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                queue_depth=self._queued,
+                active=self._active,
+                completed=self._completed,
+                mean_wait=self._waited / self._started if self._started else 0.0,
+            )
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+_shared: Pool | None = None
+_shared_lock = threading.Lock()
+
+
+def shared() -> Pool:
+    """The process wide pool, created on first use and shut down at exit."""
+    global _shared  # pylint: disable=global-statement
+    with _shared_lock:
+        if _shared is None:
+            _shared = Pool()
+            atexit.register(_shared.shutdown)
+        return _shared
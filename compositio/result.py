@@ -1,50 +1,248 @@
-from dataclasses import dataclass
-from typing import Callable, Literal
+import abc
+import collections
+import concurrent.futures
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Literal, Sequence, cast
 
+import compositio.combinators as C
 
-@dataclass
-class Result[O, E]:
-    val: tuple[Literal["Ok"], O] | tuple[Literal["Err"], E]
 
-    def map[T](self, f: Callable[[O], T]) -> "Result[T,E]":
-        match self.val:
-            case "Ok", v:
-                return Result(("Ok", f(v)))
-            case "Err", v:
-                return Result(("Err", v))
+class Result[O, E](abc.ABC):
+    """Either `Ok(value)` or `Err(error)`.
+
+    >>> ok(1).map(lambda x: x + 1)
+    Ok(2)
+    >>> e = err("boom")
+    >>> e.map(lambda x: x + 1) is e
+    True
+    >>> match ok(1):
+    ...     case Ok(v):
+    ...         v
+    1
+    """
+
+    __slots__ = ()
+    __match_args__ = ("val",)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"cannot assign to field {name!r}")
+
+    @property
+    @abc.abstractmethod
+    def val(self) -> tuple[Literal["Ok"], O] | tuple[Literal["Err"], E]:
+        """Tagged tuple of earlier versions."""
+
+    @abc.abstractmethod
+    def map[T](self, f: Callable[[O], T]) -> "Result[T, E]": ...
 
     __rtruediv__ = map
 
-    def bimap[O2, E2](self, f: Callable[[O], O2], g: Callable[[E], E2]) -> "Result[O2, E2]":
-        match self.val:
-            case "Ok", v:
-                return Result(("Ok", f(v)))
-            case "Err", v:
-                return Result(("Err", g(v)))
+    @abc.abstractmethod
+    def bimap[O2, E2](self, f: Callable[[O], O2], g: Callable[[E], E2]) -> "Result[O2, E2]": ...
 
     def __rfloordiv__[O2, E2](self, fg: tuple[Callable[[O], O2], Callable[[E], E2]]) -> "Result[O2, E2]":
         return self.bimap(fg[0], fg[1])
 
-    def bind[T](self, f: Callable[[O], "Result[T, E]"]) -> "Result[T, E]":
-        match self.val:
-            case "Ok", v:
-                return f(v)
-            case "Err", v:
-                return Result(("Err", v))
+    @abc.abstractmethod
+    def bind[T](self, f: Callable[[O], "Result[T, E]"]) -> "Result[T, E]": ...
+
+    __matmul__ = bind
+
+    @abc.abstractmethod
+    def either[R](self, onsuccess: Callable[[O], R], onfailure: Callable[[E], R]) -> R: ...
+
+
+class Ok[O](Result[O, Any]):
+    __slots__ = ("value",)
+    __match_args__ = ("value",)
+
+    value: O
+
+    def __init__(self, value: O):
+        _set_value(self, value)
+
+    @property
+    def val(self) -> tuple[Literal["Ok"], O]:
+        """Tagged tuple of earlier versions."""
+        return ("Ok", self.value)
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is Ok and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash((Ok, self.value))
+
+    def __repr__(self) -> str:
+        return f"Ok({self.value!r})"
+
+    def __reduce__(self):
+        return (Ok, (self.value,))
+
+    def map[T](self, f: Callable[[O], T]) -> "Result[T, Any]":
+        return Ok(f(self.value))
+
+    __rtruediv__ = map
+
+    def bimap[O2, E2](self, f: Callable[[O], O2], g: Callable[[Any], E2]) -> "Result[O2, E2]":
+        return Ok(f(self.value))
+
+    def bind[T, E](self, f: Callable[[O], "Result[T, E]"]) -> "Result[T, E]":
+        return f(self.value)
+
+    __matmul__ = bind
+
+    def either[R](self, onsuccess: Callable[[O], R], onfailure: Callable[[Any], R]) -> R:
+        return onsuccess(self.value)
+
+
+class Err[E](Result[Any, E]):
+    __slots__ = ("error",)
+    __match_args__ = ("error",)
+
+    error: E
+
+    def __init__(self, error: E):
+        _set_error(self, error)
+
+    @property
+    def val(self) -> tuple[Literal["Err"], E]:
+        """Tagged tuple of earlier versions."""
+        return ("Err", self.error)
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is Err and self.error == other.error
+
+    def __hash__(self) -> int:
+        return hash((Err, self.error))
+
+    def __repr__(self) -> str:
+        return f"Err({self.error!r})"
+
+    def __reduce__(self):
+        return (Err, (self.error,))
+
+    def map[T](self, f: Callable[[Any], T]) -> "Result[T, E]":
+        return self
+
+    __rtruediv__ = map
+
+    def bimap[O2, E2](self, f: Callable[[Any], O2], g: Callable[[E], E2]) -> "Result[O2, E2]":
+        return Err(g(self.error))
+
+    def bind[T](self, f: Callable[[Any], "Result[T, E]"]) -> "Result[T, E]":
+        return self
 
     __matmul__ = bind
 
-    def either[R](self, onsuccess: Callable[[O], R], onfailure: Callable[[E], R]) -> R:
-        match self.val:
-            case "Ok", v:
-                return onsuccess(v)
-            case "Err", v:
-                return onfailure(v)
+    def either[R](self, onsuccess: Callable[[Any], R], onfailure: Callable[[E], R]) -> R:
+        return onfailure(self.error)
+
+
+_set_value = Ok.value.__set__  # type: ignore[attr-defined]
+_set_error = Err.error.__set__  # type: ignore[attr-defined]
+
+
+def ok[S, F](v: S) -> Result[S, F]:
+    return Ok(v)
+
+
+def err[S, F](v: F) -> Result[S, F]:
+    return Err(v)
+
+
+def traverse[A, O, E](
+    f: Callable[[A], Result[O, E]], xs: Iterable[A], collect: bool = False
+) -> Result[Sequence[O], E] | Result[Sequence[O], list[E]]:
+    """Ok the results of `f`, or the first Err, without consuming the rest of `xs`.
+
+    With `collect`, all of `xs` is consumed and every error is returned, in a single pass.
+
+    >>> import itertools
+    >>> traverse(lambda x: err(x) if x > 2 else ok(x), itertools.count())
+    Err(3)
+    >>> traverse(lambda x: err(x) if x % 2 else ok(x), range(5), collect=True)
+    Err([1, 3])
+    """
+    values: list[O] = []
+    errors: list[E] = []
+    for x in xs:
+        match f(x):
+            case Ok(value):
+                values.append(value)
+            case Err(error) if collect:
+                errors.append(error)
+            case Err() as failure:
+                return failure
+    return Err(errors) if errors else Ok(values)
+
+
+def sequence[O, E](
+    rs: Iterable[Result[O, E]], collect: bool = False
+) -> Result[Sequence[O], E] | Result[Sequence[O], list[E]]:
+    return traverse(C.i, rs, collect)
+
+
+def _failed(r: Result[Any, Any]) -> bool:
+    return type(r) is not Ok
+
+
+def traversec[A, O, E](
+    f: Callable[[A], Result[O, E]],
+    xs: Iterable[A],
+    max_workers: int = 4,
+    window: int | None = None,
+    pool: concurrent.futures.Executor | None = None,
+) -> Result[Sequence[O], E]:
+    """Concurrent `traverse` on a thread pool, returning (and cancelling pending calls at) the first Err to complete.
+
+    >>> traversec(lambda x: ok(x * 2), [1, 2, 3])
+    Ok([2, 4, 6])
+    """
+    values, failure = C.traversec(f, xs, _failed, max_workers, window, pool)
+    # The failure is an Err and every value passed `_failed`, so it is an Ok.
+    return cast(Err[E], failure) if failure is not None else Ok([r.value for r in cast(list[Ok[O]], values)])
+
+
+async def atraversec[A, O, E](
+    f: Callable[[A], Awaitable[Result[O, E]]], xs: Iterable[A], limit: int = 64
+) -> Result[Sequence[O], E]:
+    """Concurrent `traverse` with a coroutine function, returning (and cancelling pending calls at) the first Err."""
+    values, failure = await C.atraversec(f, xs, _failed, limit)
+    return cast(Err[E], failure) if failure is not None else Ok([r.value for r in cast(list[Ok[O]], values)])
+
+
+_END: Any = object()
+
+
+def partition[O, E](rs: Iterable[Result[O, E]]) -> tuple[Iterator[O], Iterator[E]]:
+    """Lazy streams of the Ok values and of the errors.
 
+    `rs` is consumed once; what one stream reads ahead for the other is buffered until the other reads it.
 
-def ok[S, F](v: S):
-    return Result[S, F](("Ok", v))
+    >>> oks, errs = partition([ok(1), err("a"), ok(2)])
+    >>> list(oks), list(errs)
+    ([1, 2], ['a'])
+    """
+    it = iter(rs)
+    oks: collections.deque[O] = collections.deque()
+    errs: collections.deque[E] = collections.deque()
 
+    def side(own: collections.deque, other: collections.deque, kind: type) -> Iterator:
+        while True:
+            if own:
+                yield own.popleft()
+                continue
+            match next(it, _END):
+                case Ok(value):
+                    x, mine = value, kind is Ok
+                case Err(error):
+                    x, mine = error, kind is Err
+                case r if r is _END:
+                    return
+                case r:
+                    raise TypeError(f"partition expected a Result, got {type(r).__name__}")
+            if mine:
+                yield x
+            else:
+                other.append(x)
 
-def err[S, F](v: F):
-    return Result[S, F](("Err", v))
+    return side(oks, errs, Ok), side(errs, oks, Err)
@@ -0,0 +1,173 @@
+"""Bounded destinations for log entries, and a `streaming` Writer monoid that pushes entries to them.
+
+With `streaming(sink)`, a Writer hands each entry to `sink` as soon as it is told (or bound, for entries of a
+list based Writer) and only accumulates the number of entries written, so memory is bounded by the sink.
+
+>>> from compositio.writer import Writer, tell
+>>> ring = RingBuffer(2)
+>>> log = streaming(ring)
+>>> w = Writer.pure(0, log)
+>>> for _ in range(5):
+...     w = w @ (lambda x: tell(x + 1, f"step {x}", log))
+>>> w.run(), ring.entries(), ring.dropped
+((5, 5), ['step 3', 'step 4'], 3)
+
+Every sink has `write(entry)`, `flush()` (hand over everything written so far) and `close()` (flush and release).
+"""
+
+import collections
+import functools
+import io
+import os
+import queue
+import threading
+from typing import Any, Callable, Protocol, Sequence, TextIO
+
+from compositio.monoid import Monoid
+
+
+class Sink[W](Protocol):
+    def write(self, entry: W) -> None: ...
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class RingBuffer[W]:
+    """Keeps the last `maxlen` entries in memory, counting the ones it drops. Never blocks."""
+
+    def __init__(self, maxlen: int):
+        self._entries: collections.deque[W] = collections.deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def write(self, entry: W):
+        with self._lock:
+            if len(self._entries) == self._entries.maxlen:
+                self.dropped += 1
+            self._entries.append(entry)
+
+    def entries(self) -> list[W]:
+        with self._lock:
+            return list(self._entries)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileSink[W]:
+    """Writes one `format(entry)` line per entry to a file, in batches of `buffer_size` entries.
+
+    Entries reach the file when the buffer fills, on `flush()` and on `close()`.
+    """
+
+    def __init__(
+        self, file: str | os.PathLike | io.TextIOBase, buffer_size: int = 1024, format: Callable[[W], str] = str
+    ):  # pylint: disable=redefined-builtin
+        self._file: TextIO | io.TextIOBase
+        if isinstance(file, io.TextIOBase):
+            self._owned, self._file = False, file
+        else:
+            self._owned, self._file = True, open(file, "a", encoding="utf-8")
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        self.buffer_size = buffer_size
+        self.format = format
+
+    def write(self, entry: W):
+        with self._lock:
+            self._buffer.append(self.format(entry))
+            if len(self._buffer) >= self.buffer_size:
+                self._write()
+
+    def _write(self):
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._file.flush()
+            self._buffer.clear()
+
+    def flush(self):
+        with self._lock:
+            self._write()
+
+    def close(self):
+        self.flush()
+        if self._owned:
+            self._file.close()
+
+
+class QueueSink[W]:
+    """Hands entries to `consume` on a background thread, through a queue of at most `maxsize` entries.
+
+    `write` blocks while the queue is full (back-pressure), for at most `timeout` seconds before raising
+    `queue.Full`. `flush` waits until every entry written so far has been consumed. An exception raised by
+    `consume` stops the consumer and is re-raised by the next `write`, `flush` or `close`.
+    """
+
+    _STOP: Any = object()
+
+    def __init__(self, consume: Callable[[W], Any], maxsize: int = 1024, timeout: float | None = None):
+        self._queue: queue.Queue[W] = queue.Queue(maxsize)
+        self._consume = consume
+        self._error: BaseException | None = None
+        self.timeout = timeout
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                if entry is self._STOP:
+                    return
+                if self._error is None:
+                    self._consume(entry)
+            except BaseException as e:  # pylint: disable=broad-exception-caught
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, entry: W):
+        self._raise()
+        self._queue.put(entry, timeout=self.timeout)
+
+    def flush(self):
+        self._queue.join()
+        self._raise()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        self._raise()
+
+
+def _emit[W](sink: Sink[W], entry: W) -> int:
+    sink.write(entry)
+    return 1
+
+
+def _push[W](sink: Sink[W], a: int | Sequence[W], b: int | Sequence[W]) -> int:
+    """Number of entries in a and b, writing those not yet written (i.e. given as a sequence) to `sink`."""
+    count = 0
+    for x in (a, b):
+        if isinstance(x, int):
+            count += x
+        else:
+            for entry in x:
+                sink.write(entry)
+                count += 1
+    return count
+
+
+def streaming[W](sink: Sink[W]) -> Monoid[int, W]:
+    """Writer monoid writing entries to `sink`, accumulating only their count."""
+    return Monoid(0, functools.partial(_push, sink), functools.partial(_emit, sink))
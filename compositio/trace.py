@@ -0,0 +1,205 @@
+"""Opt-in per-stage profiling of arrows.
+
+`instrument` returns a copy of an arrow whose stages (including those nested in `*`, `%`, `mapa`, `mapca`, ...)
+report their timings to a `Profile`. Arrows that are not instrumented are not affected at all.
+
+>>> import time
+>>> profile = Profile()
+>>> pipeline = instrument(mapa(abs) >> sum, profile)
+>>> pipeline([-1, 2, -3])
+6
+>>> sorted(profile.report())
+['pipeline', 'pipeline;Map', 'pipeline;Map;abs', 'pipeline;sum']
+>>> profile.report()["pipeline;Map;abs"]["calls"]
+3
+"""
+
+import dataclasses
+import inspect
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, TypeGuard
+
+import compositio.ir as IR
+from compositio.arrows import Arrow, mapa
+
+if TYPE_CHECKING:
+    from _typeshed import DataclassInstance
+
+type Path = tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Event:
+    path: Path
+    elapsed: float
+    """Seconds."""
+    error: BaseException | None = None
+
+
+class StageStats:
+    """Call count, errors and latencies of one stage. Latency percentiles come from a bounded random sample."""
+
+    def __init__(self, max_samples: int):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.samples: list[float] = []
+        self.max_samples = max_samples
+
+    def add(self, elapsed: float, error: BaseException | None):
+        self.calls += 1
+        self.errors += error is not None
+        self.total += elapsed
+        if len(self.samples) < self.max_samples:
+            self.samples.append(elapsed)
+        else:
+            i = random.randrange(self.calls)
+            if i < self.max_samples:
+                self.samples[i] = elapsed
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total": self.total,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+        }
+
+
+class Profile:
+    """Thread-safe collector of stage timings. `hook`, if given, is called with every `Event`."""
+
+    def __init__(self, hook: Callable[[Event], None] | None = None, max_samples: int = 10_000):
+        self.hook = hook
+        self.max_samples = max_samples
+        self.stages: dict[Path, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: Path, elapsed: float, error: BaseException | None = None):
+        with self._lock:
+            stats = self.stages.get(path)
+            if stats is None:
+                stats = self.stages[path] = StageStats(self.max_samples)
+            stats.add(elapsed, error)
+        if self.hook is not None:
+            self.hook(Event(path, elapsed, error))
+
+    def report(self) -> dict[str, dict[str, float]]:
+        """Summary per stage, keyed by the `;` separated path of the stage. Times are in seconds."""
+        with self._lock:
+            return {";".join(path): stats.summary() for path, stats in self.stages.items()}
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.report(), **kwargs)
+
+    def to_collapsed(self) -> str:
+        """Collapsed stacks (one `path self-time-in-microseconds` line per stage), as read by flamegraph tools.
+
+        Lazy stages such as `mapa` do their work outside of their own call, so their self time is clamped to 0.
+        """
+        with self._lock:
+            totals = {path: stats.total for path, stats in self.stages.items()}
+        lines = []
+        for path, total in totals.items():
+            children = sum(t for p, t in totals.items() if len(p) == len(path) + 1 and p[:-1] == path)
+            lines.append(f"{';'.join(path)} {max(0, round((total - children) * 1e6))}")
+        return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class Traced[A, B]:
+    """x -> f x, reporting the time it takes to `profile`."""
+
+    f: Callable[[A], B]
+    path: Path
+    profile: Profile
+
+    def __call__(self, x: A) -> B:
+        start = time.perf_counter()
+        try:
+            y = self.f(x)
+        except BaseException as e:
+            self.profile.record(self.path, time.perf_counter() - start, e)
+            raise
+        if inspect.isawaitable(y):
+            return self._wait(y, start)
+        self.profile.record(self.path, time.perf_counter() - start)
+        return y
+
+    async def _wait(self, y, start: float):
+        try:
+            y = await y
+        except BaseException as e:
+            self.profile.record(self.path, time.perf_counter() - start, e)
+            raise
+        self.profile.record(self.path, time.perf_counter() - start)
+        return y
+
+
+def instrument[A, B](arrow: Arrow[A, B], profile: Profile, name: str = "pipeline") -> Arrow[A, B]:
+    """Copy of `arrow` reporting the timings of itself and each of its stages to `profile`, under `name`."""
+    return type(arrow)._of((_instrument(arrow, (name,), profile),))
+
+
+def _instrument(stage: Callable[[Any], Any], path: Path, profile: Profile) -> Callable[[Any], Any]:
+    match stage:
+        case Arrow() if len(stage.stages) == 1:
+            return type(stage)._of((_instrument(stage.stages[0], path, profile),))
+        case Arrow():
+            labels = _unique([_label(s) for s in stage.stages])
+            inner = tuple(_instrument(s, path + (l,), profile) for s, l in zip(stage.stages, labels))
+            return Traced(type(stage)._of(inner), path, profile)
+        case IR.ProcessMap():
+            # Runs in other processes, which can't report back.
+            return Traced(stage, path, profile)
+        case _ if _is_node(stage):
+            children = {
+                field.name: getattr(stage, field.name)
+                for field in dataclasses.fields(stage)
+                if field.name in ("f", "g")
+            }
+            labels = dict(zip(children, _unique([_label(c) for c in children.values()])))
+            inner = {k: _instrument(c, path + (labels[k],), profile) for k, c in children.items()}
+            node: Callable[[Any], Any] = dataclasses.replace(stage, **inner)  # type: ignore[assignment]
+            return Traced(node, path, profile)
+        case _:
+            return Traced(stage, path, profile)
+
+
+def _is_node(stage: Callable[[Any], Any]) -> "TypeGuard[DataclassInstance]":
+    """Whether `stage` is a dataclass instance, e.g. an `ir` node, rather than a dataclass used as a constructor."""
+    return dataclasses.is_dataclass(stage) and not isinstance(stage, type)
+
+
+def _label(stage: Callable[[Any], Any]) -> str:
+    match stage:
+        case Arrow() if len(stage.stages) == 1:
+            return _label(stage.stages[0])
+        case Arrow():
+            return type(stage).__name__
+        case _ if _is_node(stage):
+            return type(stage).__name__
+        case _:
+            return getattr(stage, "__name__", None) or type(stage).__name__
+
+
+def _unique(labels: list[str]) -> list[str]:
+    """Number repeated labels: a, a, b -> a, a[1], b"""
+    seen: dict[str, int] = {}
+    result = []
+    for label in labels:
+        n = seen.get(label, 0)
+        seen[label] = n + 1
+        result.append(f"{label}[{n}]" if n else label)
+    return result
@@ -1,30 +1,137 @@
-from dataclasses import dataclass
-from typing import Callable
+import copy
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from compositio.monoid import Monoid
+
+
+class Log[W](Sequence[W]):
+    """Immutable log with O(1) concatenation.
+
+    Concatenation builds a tree of logs; it is flattened (without recursion) only when iterated. The first
+    lookup (indexing, `in`, `index`, `count`, `reversed`) flattens it once into a tuple kept for later ones.
+
+    >>> log = Log.concat(Log.concat(["a"], ["b"]), ["c"])
+    >>> log
+    Log(['a', 'b', 'c'])
+    >>> log == ["a", "b", "c"], len(log), log[-1]
+    (True, 3, 'c')
+    """
+
+    __slots__ = ("_parts", "_len", "_flat")
+
+    def __init__(self, entries: Iterable[W] = ()):
+        self._flat: tuple[W, ...] | None = tuple(entries)
+        self._parts: tuple[Sequence[W], ...] = (self._flat,)
+        self._len = len(self._flat)
+
+    @staticmethod
+    def concat(a: Sequence[W], b: Sequence[W]) -> Sequence[W]:
+        """a + b, in O(1) time and space."""
+        if not b:
+            return a
+        if not a:
+            return b
+        log = Log.__new__(Log)
+        log._parts = (a, b)
+        log._len = len(a) + len(b)
+        log._flat = None
+        return log
+
+    def _entries(self) -> tuple[W, ...]:
+        if self._flat is None:
+            self._flat = tuple(self)
+        return self._flat
+
+    def __iter__(self) -> Iterator[W]:
+        stack: list[Sequence[W]] = [self]
+        while stack:
+            part = stack.pop()
+            if type(part) is Log:
+                stack.extend(reversed(part._parts))
+            else:
+                yield from part
+
+    def __getitem__(self, i):
+        return self._entries()[i]
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._entries()
+
+    def __reversed__(self) -> Iterator[W]:
+        return reversed(self._entries())
+
+    def index(self, value: Any, start: int = 0, stop: int = sys.maxsize) -> int:
+        return self._entries().index(value, start, stop)
+
+    def count(self, value: Any) -> int:
+        return self._entries().count(value)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+    def __eq__(self, other: object) -> bool:
+        match other:
+            case Log() | list() | tuple():
+                return len(self) == len(other) and self._entries() == tuple(other)
+            case _:
+                return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Log({list(self)!r})"
+
+
+def _singleton[W](w: W) -> list[W]:
+    return [w]
+
+
+LOG: Monoid[Sequence, object] = Monoid(Log(), Log.concat, _singleton)
+"""The default accumulator of a Writer: a sequence of entries, returned by `Writer.run` as a new list."""
 
 
 @dataclass(eq=True, frozen=True)
 class Writer[A, W]:
+    """A value with an accumulator `con`, combined across binds with `monoid` (by default a `Log` of entries).
+
+    With another monoid the accumulator stays constant in size however many binds run:
+
+    >>> from compositio.monoid import SUM
+    >>> (Writer.pure(1, SUM) @ (lambda x: tell(x * 2, 3, SUM)) @ (lambda x: tell(x + 1, 4, SUM))).run()
+    (3, 7)
+    """
+
     val: A
-    con: list[W]
+    con: Sequence[W]
+    monoid: Monoid = field(default=LOG, repr=False, compare=False)
 
     def map[B](self, f: Callable[[A], B]):
-        return Writer(f(self.val), self.con)
+        return Writer(f(self.val), self.con, self.monoid)
 
     __rtruediv__ = map
 
     @classmethod
-    def pure(cls, val: A):
-        return cls(val, [])
+    def pure(cls, val: A, monoid: Monoid = LOG):
+        # A copy, so that mutable empties (such as COUNTER's) are never shared between writers.
+        return cls(val, copy.copy(monoid.empty), monoid)
 
     def bind[B](self, f: Callable[[A], "Writer[B, W]"]) -> "Writer[B, W]":
         r = f(self.val)
-        return Writer(val=f(self.val).val, con=self.con + r.con)
+        return Writer(val=r.val, con=self.monoid.combine(self.con, r.con), monoid=self.monoid)
 
     __matmul__ = bind
 
-    def run(self):
-        return (self.val, self.con)
+    def run(self) -> tuple[A, Any]:
+        return (self.val, list(self.con) if self.monoid is LOG else self.con)
 
 
 def write[T, W](val: T, con: W) -> Writer[T, W]:
     return Writer(val, [con])
+
+
+def tell[T, W](val: T, entry: W, monoid: Monoid = LOG) -> Writer[T, W]:
+    """`val`, with `entry` added to the accumulator of `monoid`."""
+    return Writer(val, monoid.unit(entry), monoid)
@@ -0,0 +1,84 @@
+import asyncio
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from compositio.aio import AsyncArrow, alist, amapa
+from compositio.arrows import Arrow
+
+
+async def add1(x: int) -> int:
+    await asyncio.sleep(0)
+    return x + 1
+
+
+def mul2(x: int) -> int:
+    return x * 2
+
+
+addA = AsyncArrow(add1)
+mulA = Arrow(mul2)
+
+
+@given(st.integers())
+def test_async_arrow_composition(v: int):
+    assert asyncio.run((addA >> mulA)(v)) == mul2(v + 1)
+    assert asyncio.run((mulA >> addA)(v)) == mul2(v) + 1
+    assert asyncio.run((mul2 >> addA >> mul2)(v)) == mul2(mul2(v) + 1)
+    assert asyncio.run(v | addA >> mulA) == mul2(v + 1)
+
+
+@given(st.integers(), st.integers())
+def test_async_arrow_split_fanout(v: int, w: int):
+    assert asyncio.run((addA * mulA)((v, w))) == (v + 1, mul2(w))
+    # AsyncArrow.__rmul__ takes precedence at runtime, but type checkers pick Arrow.__mul__.
+    assert asyncio.run((mulA * addA)((v, w))) == (mul2(v), w + 1)  # type: ignore[arg-type]
+    assert asyncio.run((addA % mulA)(v)) == (v + 1, mul2(v))
+
+
+def test_async_branches_run_concurrently():
+    async def wait(x):
+        await asyncio.sleep(0.1)
+        return x
+
+    async def timed():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await (AsyncArrow(wait) % AsyncArrow(wait))(1)
+        return result, loop.time() - start
+
+    result, elapsed = asyncio.run(timed())
+    assert result == (1, 1)
+    assert elapsed < 0.19
+
+
+def test_arrow_of_async_arrow():
+    # A plain arrow wrapping an async one keeps it as a single (async) stage.
+    assert asyncio.run(Arrow(addA >> mul2)(1)) == 4
+    assert asyncio.run(Arrow(addA >> str)(1)) == "2"
+
+
+@given(st.lists(st.integers()), st.integers(min_value=1, max_value=8))
+def test_amapa(vs: list[int], limit: int):
+    async def source():
+        for v in vs:
+            yield v
+
+    assert asyncio.run((amapa(add1, limit) >> alist)(source())) == [v + 1 for v in vs]
+    assert asyncio.run((amapa(mul2, limit) >> alist)(vs)) == [mul2(v) for v in vs]
+
+
+def test_amapa_limit():
+    running = 0
+    peak = 0
+
+    async def track(x):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return x
+
+    assert asyncio.run((amapa(track, limit=3) >> alist)(range(20))) == list(range(20))
+    assert peak <= 3
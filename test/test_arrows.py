@@ -1,7 +1,32 @@
-from hypothesis import given
+import concurrent.futures
+import functools
+import itertools
+import operator
+import pickle
+import time
+from collections import Counter
+from typing import Sequence
+
+import pytest
+from hypothesis import given, settings
 from hypothesis import strategies as st
 
-from compositio.arrows import Arrow
+from compositio.arrows import (
+    Arrow,
+    batcha,
+    fanoutca,
+    filtera,
+    first,
+    flatmapa,
+    mapa,
+    mapca,
+    mapchoicea,
+    mappa,
+    reducepa,
+    splitca,
+)
+from compositio.monoid import COUNTER, SUM, Monoid
+from compositio.result import err, ok
 
 
 def null(_: int) -> int | None:
@@ -80,3 +105,162 @@ def test_arrow_mod(v: int):
 #     """Test the xor operator for arrows."""
 #     assert (addA ^ 123)(1) == addA.f(1)
 #     assert (addA ^ 123)(None) == 123
+
+
+def test_arrow_long_chain():
+    """Long chains are flattened, so they don't grow the call stack."""
+    chain = addA
+    for _ in range(5000):
+        chain = chain >> addA
+    assert len(chain.stages) == 5001
+    assert chain(1) == 5002
+
+
+def test_arrow_match_args():
+    match addA:
+        case Arrow(f):
+            assert f is add1
+
+
+def test_arrow_pickle():
+    """Composed arrows are made of picklable stage nodes."""
+    pipeline = (addA >> mul2) % mulA >> (addA * addA) >> first(mulA)
+    restored = pickle.loads(pickle.dumps(pipeline))
+    assert restored(3) == pipeline(3)
+    assert len(restored.stages) == len(pipeline.stages)
+
+
+@given(st.lists(st.integers()), st.integers(min_value=1, max_value=8))
+def test_batch_arrow(vs: list[int], size: int):
+    """Batch arrows compose with scalar arrows and agree with mapa."""
+
+    def mul2_all(xs: Sequence[int]) -> list[int]:
+        return [mul2(x) for x in xs]
+
+    double = Arrow.vectorized(mul2_all)
+    pipeline = addA >> double >> mul2
+    assert list(batcha(pipeline, size)(vs)) == list(mapa(addA >> mulA >> mulA)(vs))
+    assert (double % addA)(vs) == (list(map(mul2, vs)), list(map(add1, vs)))
+    assert (double * addA)((vs, vs)) == (list(map(mul2, vs)), list(map(add1, vs)))
+
+
+def test_batch_arrow_numpy():
+    np = pytest.importorskip("numpy")
+    pipeline = Arrow.vectorized(np.sqrt) >> Arrow.vectorized(np.negative) >> addA
+    xs = np.arange(10.0)
+    assert np.array_equal(batcha(pipeline, size=3)(xs), 1 - np.sqrt(xs))
+
+
+def test_mapca_is_lazy():
+    """mapca only pulls a bounded window of its input ahead of the consumer."""
+    pulled = []
+
+    def source():
+        for i in itertools.count():
+            pulled.append(i)
+            yield i
+
+    results = mapca(add1, max_workers=2, window=3)(source())
+    assert pulled == []
+    assert list(itertools.islice(results, 5)) == [1, 2, 3, 4, 5]
+    assert len(pulled) <= 5 + 3
+
+
+@given(st.lists(st.integers(), max_size=50), st.sampled_from([None, 1, 7]))
+@settings(max_examples=5, deadline=None)
+def test_mappa(vs: list[int], chunksize: int | None):
+    assert list(mappa(add1, max_workers=2, chunksize=chunksize)(vs)) == [add1(v) for v in vs]
+
+
+@given(st.integers(), st.integers())
+def test_concurrent_split_fanout(v: int, w: int):
+    assert splitca(addA, mulA)((v, w)) == (addA * mulA)((v, w))
+    assert fanoutca(addA, mulA)(v) == (addA % mulA)(v)
+
+
+def test_concurrent_branches_overlap():
+    wait = Arrow(lambda x: time.sleep(0.1) or x)
+    start = time.perf_counter()
+    assert fanoutca(wait, wait)(1) == (1, 1)
+    assert splitca(wait, wait)((1, 2)) == (1, 2)
+    assert time.perf_counter() - start < 0.39
+
+
+def test_concurrent_branch_errors():
+    def fail(e: Exception):
+        def raise_(_):
+            raise e
+
+        return Arrow(raise_)
+
+    left, right = KeyError("left"), ValueError("right")
+    with pytest.raises(KeyError):
+        fanoutca(fail(left), fail(right))(1)
+    with pytest.raises(ValueError):
+        splitca(addA, fail(right))((1, 2))
+
+
+@given(st.lists(st.text(max_size=3), max_size=200), st.integers(min_value=1, max_value=7))
+def test_reducepa(vs: list[str], chunksize: int):
+    """Chunks are combined in input order, so non-commutative monoids work."""
+    concat = Monoid("", operator.add)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        assert reducepa(concat, chunksize, max_workers=3, executor=executor)(iter(vs)) == "".join(vs)
+
+
+def test_reducepa_processes():
+    assert reducepa(SUM, chunksize=100, max_workers=2)(range(10_000)) == sum(range(10_000))
+    assert reducepa(COUNTER, chunksize=100, max_workers=2)("abracadabra" * 100) == Counter("abracadabra" * 100)
+
+
+def even(x: int) -> bool:
+    return x % 2 == 0
+
+
+def upto(x: int) -> range:
+    return range(x % 4)
+
+
+@given(st.lists(st.integers()), st.sampled_from([list, tuple, iter]))
+def test_fused_stages(vs: list[int], sink):
+    pipeline = mapa(add1) >> filtera(even) >> flatmapa(upto) >> mapa(mul2) >> sink
+    expected = [mul2(y) for v in vs if even(add1(v)) for y in upto(add1(v))]
+    assert list(pipeline(vs)) == expected
+    assert len(pipeline.stages) == 5
+    if sink is not iter:
+        assert type(pipeline(vs)) is sink
+    pipeline = filtera(even) >> mapa(add1) >> sorted >> mapa(add1) >> mapa(add1)
+    assert list(pipeline(vs)) == sorted(v + 3 for v in vs if even(v))
+
+
+def test_long_fused_chain():
+    pipeline = functools.reduce(operator.rshift, [mapa(add1)] * 500) >> list
+    assert pipeline([0, 1]) == [500, 501]
+
+
+results = st.lists(st.one_of(st.builds(ok, st.integers()), st.builds(err, st.integers())))
+
+
+@given(results)
+def test_choice(rs):
+    for r in rs:
+        assert (addA + mulA)(r) == r.bimap(add1, mul2)
+        assert (addA - mulA)(r) == r.either(add1, mul2)
+
+
+@given(results)
+def test_mapchoicea(rs):
+    calls = []
+
+    def batch(f):
+        def run(xs):
+            calls.append(len(xs))
+            return [f(x) for x in xs]
+
+        return Arrow(run)
+
+    assert mapchoicea(addA + mulA, lift=batch)(rs) == [(addA + mulA)(r) for r in rs]
+    assert len(calls) <= 2
+    assert mapchoicea(addA - mulA, lift=mapca)(iter(rs)) == [(addA - mulA)(r) for r in rs]
+    with pytest.raises(TypeError):
+        mapchoicea(addA)
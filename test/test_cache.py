@@ -0,0 +1,160 @@
+import functools
+import operator
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from compositio.arrows import Arrow, cachea, mapa, mapca, mappa, persista
+from compositio.cache import MISSING, Cached, CacheStats, DiskCache, LRUCache
+
+
+def cache_stats(arrow: Arrow) -> CacheStats:
+    (stage,) = arrow.stages
+    assert isinstance(stage, Cached)
+    return stage.stats()
+
+
+def mod7(x: int) -> int:
+    return x % 7
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@given(st.lists(st.integers(min_value=0, max_value=20)), st.integers(min_value=1, max_value=8))
+def test_cachea_agrees_with_uncached(vs: list[int], maxsize: int):
+    calls = []
+
+    def square(x: int) -> int:
+        calls.append(x)
+        return x * x
+
+    stage = cachea(square, maxsize=maxsize)
+    assert list(mapa(stage)(vs)) == [v * v for v in vs]
+    stats = cache_stats(stage)
+    assert stats.hits + stats.misses == len(vs)
+    assert stats.misses == len(calls)
+    assert stats.size <= maxsize
+
+
+def test_cached_method_and_key():
+    stage = (Arrow(sum) >> str).cached(key=tuple)
+    assert stage([1, 2]) == stage([1, 2]) == "3"
+    assert cache_stats(stage).hits == 1
+
+
+def test_ttl():
+    clock = Clock()
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 5
+    assert cache.get("a") == 1
+    clock.now = 11
+    assert cache.get("a") is MISSING
+    assert cache.stats().evictions == 1
+
+
+def test_thread_safe_under_mapca():
+    stage = cachea(mod7, maxsize=4)
+    assert list(mapca(stage, max_workers=8)(range(1000))) == [mod7(x) for x in range(1000)]
+    stats = cache_stats(stage)
+    assert stats.hits + stats.misses == 1000
+    assert stats.size <= 4
+
+
+def test_pickle_drops_entries():
+    cache = LRUCache(maxsize=3, ttl=1.5)
+    cache.put("a", 1)
+    restored = pickle.loads(pickle.dumps(cache))
+    assert (restored.maxsize, restored.ttl, len(restored)) == (3, 1.5, 0)
+
+
+def double(x: int) -> int:
+    return x * 2
+
+
+def test_persista(tmp_path):
+    path = tmp_path / "cache.db"
+    assert list(mapa(persista(double, DiskCache(path)))(range(10))) == [double(x) for x in range(10)]
+
+    # A new run only computes new inputs.
+    calls = []
+
+    def tracked(x: int) -> int:
+        calls.append(x)
+        return double(x)
+
+    rerun = persista(tracked, DiskCache(path), name="double")
+    assert list(mapa(rerun)(range(12))) == [double(x) for x in range(12)]
+    assert calls == [10, 11]
+
+    # A new version recomputes everything.
+    calls.clear()
+    assert persista(tracked, DiskCache(path), version="2", name="double")(1) == 2
+    assert calls == [1]
+
+
+def test_persista_needs_stable_name(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db")
+    for f in [lambda x: x + 1, functools.partial(operator.mul, 2), Clock()]:
+        with pytest.raises(ValueError, match="explicit name"):
+            persista(f, cache)
+
+    def inc(x: int) -> int:
+        return x + 1
+
+    def dbl(x: int) -> int:
+        return x * 2
+
+    with pytest.raises(ValueError, match="explicit name"):
+        persista(inc, cache)
+    assert (persista(inc, cache, name="inc")(10), persista(dbl, cache, name="dbl")(10)) == (11, 20)
+
+
+def test_persista_concurrent(tmp_path):
+    stage = persista(double, DiskCache(tmp_path / "cache.db", max_entries=50))
+    assert list(mapca(stage, max_workers=8)(range(200))) == [double(x) for x in range(200)]
+    assert list(mappa(stage, max_workers=2)(range(200))) == [double(x) for x in range(200)]
+    assert cache_stats(stage).size <= 50
+
+
+def test_disk_cache_max_bytes(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", max_bytes=1000)
+    for i in range(20):
+        cache.put(bytes([i]), b"x" * 100)
+    assert cache.stats().size < 10
+    assert cache.get(bytes([19])) == b"x" * 100
+
+
+def test_disk_cache_totals(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", max_entries=3)
+    for i in range(5):
+        cache.put(b"same", i)
+    assert cache.stats().size == 1
+    for i in range(10):
+        cache.put(bytes([i]), i)
+    assert (cache.stats().size, cache.stats().evictions) == (3, 8)
+    assert DiskCache(tmp_path / "cache.db").stats().size == 3
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_content_key_is_canonical():
+    script = "from compositio.cache import ContentKey; print(ContentKey('f')(({'a', 'b', 'c'}, {'x': {1, 2}})).hex())"
+    keys = {
+        subprocess.run(
+            [sys.executable, "-c", script], env={**os.environ, "PYTHONHASHSEED": seed}, capture_output=True, text=True
+        ).stdout
+        for seed in ("1", "2", "3")
+    }
+    assert len(keys) == 1
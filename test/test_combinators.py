@@ -0,0 +1,55 @@
+import functools
+import operator
+from typing import Any
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from compositio.combinators import curry
+
+
+def add3(a: int, b: int, c: int) -> int:
+    return a + b + c
+
+
+@given(st.integers(), st.integers(), st.integers())
+def test_curry_positional(a: int, b: int, c: int):
+    f: Any = curry(add3)  # mixed application styles are beyond the overloads
+    assert f(a)(b)(c) == f(a, b)(c) == f(a)(b, c) == f(a, b, c) == add3(a, b, c)
+    assert f(a)(b, c=c) == f(c=c)(a, b) == add3(a, b, c)
+
+
+def test_curry_defaults_and_keyword_only():
+    def f(a, b=10, *, k, opt=1):
+        return (a, b, k, opt)
+
+    g = curry(f)
+    assert g(1)(k=2) == (1, 10, 2, 1)
+    assert g(k=2)(1, 3) == (1, 3, 2, 1)
+    assert g(1, opt=5)(k=2) == (1, 10, 2, 5)
+
+
+def test_curry_builtins_and_partials():
+    assert curry(operator.add)(1)(2) == 3
+    assert curry(functools.partial(add3, 1))(2)(3) == 6
+    assert curry(max)(1, 2) == 2  # type: ignore[call-arg]
+
+
+def test_curry_partial_application_is_flat():
+    p = curry(add3)(1)(2)
+    assert isinstance(p, functools.partial) and p.args == (1, 2)
+    assert p(3) == 6
+
+
+def test_curry_method():
+    class Account:
+        def __init__(self, balance: int):
+            self.balance = balance
+
+        @curry
+        def transfer(self, amount: int, fee: int) -> int:
+            return self.balance - amount - fee
+
+    account: Any = Account(100)
+    assert account.transfer(10)(1) == account.transfer(10, 1) == 89
+    assert Account.transfer(account)(10)(1) == 89
@@ -0,0 +1,61 @@
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from compositio import maybe as M
+from compositio import result as R
+from compositio.arrows import Arrow, mapa, mapca
+from compositio.kleisli import Kleisli
+
+
+def halfM(x: int) -> M.Maybe[int]:
+    return M.just(x // 2) if x % 2 == 0 else M.nothing()
+
+
+def halfR(x: int) -> R.Result[int, str]:
+    return R.ok(x // 2) if x % 2 == 0 else R.err(f"odd: {x}")
+
+
+@given(st.integers())
+def test_kleisli_matches_bind(v: int):
+    assert (Kleisli(halfM) >> halfM >> halfM)(v) == M.just(v) @ halfM @ halfM @ halfM
+    assert (Kleisli(halfR) >> halfR >> halfR)(v) == R.ok(v) @ halfR @ halfR @ halfR
+    assert (halfM >> Kleisli(halfM))(v) == M.just(v) @ halfM @ halfM
+
+
+def test_kleisli_short_circuits():
+    calls = []
+
+    def tracked(x: int) -> R.Result[int, str]:
+        calls.append(x)
+        return halfR(x)
+
+    failure = R.err("stop")
+    assert (Kleisli(tracked) >> (lambda _: failure) >> tracked >> tracked)(4) is failure
+    assert calls == [4]
+
+
+@given(st.lists(st.integers()))
+def test_kleisli_maps(vs: list[int]):
+    k = Kleisli(halfR) >> halfR
+    expected = [R.ok(v) @ halfR @ halfR for v in vs]
+    assert list(mapa(k)(vs)) == expected
+    assert list(mapca(k)(vs)) == expected
+    assert R.traverse(k, vs) == R.sequence(expected)  # type: ignore[arg-type]
+
+
+def test_kleisli_rejects_plain_stages():
+    with pytest.raises(TypeError):
+        (Arrow(int) >> Kleisli(halfM))("8")  # type: ignore[operator]
+    with pytest.raises(TypeError):
+        (int >> Kleisli(halfM))("8")  # type: ignore[operator]
+    with pytest.raises(TypeError):
+        (Kleisli(halfM) >> str)(8)  # type: ignore[operator]
+
+
+def test_arrow_of_kleisli():
+    # A Kleisli arrow wrapped in a plain arrow stays one stage and keeps its semantics.
+    quarter = Kleisli(halfM) >> halfM
+    assert Arrow(quarter)(8) == M.just(2)
+    assert (Arrow(quarter) >> str)(6) == "Nothing()"
+    assert Kleisli(Arrow(halfR))(8) == R.ok(4)
@@ -1,3 +1,9 @@
+import asyncio
+import itertools
+import pickle
+import time
+
+import pytest
 from hypothesis import given
 from hypothesis import strategies as st
 
@@ -101,3 +107,79 @@ def test_both():
     assert M.both(M.just(1), M.nothing()) == M.nothing()
     assert M.both(M.nothing(), M.just(2)) == M.nothing()
     assert M.both(M.nothing(), M.nothing()) == M.nothing()
+
+
+def test_nothing_is_singleton():
+    assert M.nothing() is M.Nothing() is M.NOTHING
+    assert M.just(None) != M.nothing()
+    assert pickle.loads(pickle.dumps(M.nothing())) is M.NOTHING
+    assert pickle.loads(pickle.dumps(M.just([1]))) == M.just([1])
+
+
+def test_Maybe_match():
+    def describe(m: M.Maybe[int]) -> str:
+        match m:
+            case M.Just(v):
+                return f"just {v}"
+            case M.Nothing():
+                return "nothing"
+        return "?"
+
+    assert describe(M.just(1)) == "just 1"
+    assert describe(M.nothing()) == "nothing"
+    assert M.just(1).val == ("Just", 1)
+    assert M.nothing().val is None
+
+
+def test_Maybe_match_tagged_val():
+    def describe(m: M.Maybe[int]) -> str:
+        match m:
+            case M.Maybe(("Just", v)):
+                return f"just {v}"
+            case M.Maybe(None):
+                return "nothing"
+        return "?"
+
+    assert describe(M.just(1)) == "just 1"
+    assert describe(M.nothing()) == "nothing"
+    with pytest.raises(TypeError):
+        M.Maybe()  # type: ignore[abstract]
+
+
+def test_Maybe_is_immutable():
+    with pytest.raises(AttributeError):
+        M.just(1).value = 2
+    assert hash(M.just(1)) == hash(M.just(1))
+
+
+@given(st.lists(st.integers()))
+def test_traversec(vs: list[int]):
+    def even(x: int) -> M.Maybe[int]:
+        return M.just(x) if x % 2 == 0 else M.nothing()
+
+    assert M.traversec(even, vs, max_workers=3) == M.traverse(even, vs)
+    assert asyncio.run(M.atraversec(_async(even), vs)) == M.traverse(even, vs)
+
+
+def _async(f):
+    async def g(x):
+        await asyncio.sleep(0)
+        return f(x)
+
+    return g
+
+
+def test_traversec_fails_fast():
+    calls = []
+
+    def check(x: int) -> M.Maybe[int]:
+        calls.append(x)
+        time.sleep(0.001)
+        return M.nothing() if x == 0 else M.just(x)
+
+    assert M.traversec(check, itertools.count(), max_workers=2, window=4) == M.nothing()
+    assert len(calls) <= 4
+
+    calls.clear()
+    assert asyncio.run(M.atraversec(_async(check), itertools.count(), limit=4)) == M.nothing()
+    assert len(calls) <= 4
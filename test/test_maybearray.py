@@ -0,0 +1,43 @@
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from compositio import maybe as M
+from compositio.maybearray import MaybeArray
+
+optionals = st.lists(st.one_of(st.none(), st.integers(min_value=-(2**31), max_value=2**31 - 1)))
+
+
+def half(x: int) -> M.Maybe[int]:
+    return M.just(x // 2) if x % 2 == 0 else M.nothing()
+
+
+@given(optionals, st.sampled_from([None, "q"]))
+def test_MaybeArray_agrees_with_maybe(xs, typecode):
+    ms = [M.from_optional(x) for x in xs]
+    column = MaybeArray.from_optionals(xs, typecode)
+    assert column.to_maybes() == ms
+    assert MaybeArray.from_maybes(ms, typecode) == column
+    assert column.to_optionals() == xs
+    assert column.map(lambda x: x + 1).to_maybes() == [m.map(lambda x: x + 1) for m in ms]
+    assert column.bind(half).to_maybes() == [m.bind(half) for m in ms]
+    assert column.cat_maybes() == M.cat_maybes(ms)
+    assert column.sequence().map(list) == M.sequence(ms)
+    assert [column[i] for i in range(len(xs))] == ms
+
+
+def test_MaybeArray_validates_lengths():
+    with pytest.raises(ValueError):
+        MaybeArray([1, 2], bytearray(b"\1"))
+
+
+def test_MaybeArray_numpy():
+    np = pytest.importorskip("numpy")
+    column = MaybeArray(np.array([1.0, 4.0, 9.0]), np.array([True, False, True]))
+    assert list(column.map(np.sqrt, vectorized=True).cat_maybes()) == [1.0, 3.0]
+    assert column.sequence() == M.nothing()
+    match MaybeArray(np.arange(3)).sequence():
+        case M.Just(values):
+            assert list(values) == [0, 1, 2]
+        case other:
+            pytest.fail(f"expected Just, got {other}")
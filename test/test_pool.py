@@ -0,0 +1,59 @@
+import threading
+import time
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from compositio import pool as P
+from compositio.arrows import Arrow, fanoutca, mapca, splitca
+from compositio.combinators import mapcm
+
+
+def add1(x: int) -> int:
+    return x + 1
+
+
+@given(st.lists(st.integers()))
+def test_mapca_with_pool(vs: list[int]):
+    pool = P.shared()
+    before = pool.stats().completed
+    assert list(mapca(add1, pool=pool)(vs)) == [v + 1 for v in vs]
+    assert list(mapcm(add1, vs, pool=pool)) == [v + 1 for v in vs]
+    assert pool.stats().completed >= before + len(vs)
+
+
+def test_shared_pool_is_reused():
+    assert P.shared() is P.shared()
+
+
+def test_pool_stats():
+    gate = threading.Event()
+    with P.Pool(max_workers=1) as pool:
+        running = pool.submit(gate.wait)
+        queued = [pool.submit(add1, i) for i in range(3)]
+        while pool.stats().active == 0:
+            pass
+        stats = pool.stats()
+        assert stats.active == 1
+        assert stats.queue_depth == 3
+        queued[-1].cancel()
+        assert pool.stats().queue_depth == 2
+        gate.set()
+        assert running.result() and [q.result() for q in queued[:-1]] == [1, 2]
+    stats = pool.stats()
+    assert (stats.active, stats.queue_depth, stats.completed) == (0, 0, 3)
+    assert stats.mean_wait >= 0
+
+
+def slow(x: int) -> int:
+    time.sleep(0.001)
+    return x
+
+
+def test_concurrent_branches_on_pool_workers():
+    # Branches started from the pool's own workers must not wait for a free worker.
+    xs = range(50)
+    assert list(mapca(fanoutca(Arrow(slow), Arrow(slow)), pool=P.shared(), window=64)(xs)) == [(x, x) for x in xs]
+    with P.Pool(max_workers=2) as pool:
+        split = splitca(Arrow(slow), Arrow(slow), pool=pool)
+        assert list(mapca(split, pool=pool)(zip(xs, xs))) == [(x, x) for x in xs]
@@ -1,3 +1,9 @@
+import asyncio
+import itertools
+import pickle
+import time
+
+import pytest
 from hypothesis import given
 from hypothesis import strategies as st
 
@@ -67,3 +73,112 @@ def test_Result_bind_op():
     assert (m @ appendM("s")) == result.ok("as")
     assert (m @ appendM("s")) @ appendM("t") == result.ok("ast")
     assert m @ (lambda s: appendM("s")(s) @ appendM("t")) == result.ok("ast")
+
+
+def test_Result_err_passes_through():
+    e = result.err("e")
+    assert e.map(append("b")) is e
+    assert e.bind(appendM("b")) is e
+    assert result.ok("a").bind(lambda _: e) is e
+
+
+def test_Result_match_and_pickle():
+    def describe(r: result.Result[str, str]) -> str:
+        match r:
+            case result.Ok(v):
+                return f"ok {v}"
+            case result.Err(e):
+                return f"err {e}"
+        return "?"
+
+    assert describe(result.ok("a")) == "ok a"
+    assert describe(result.err("e")) == "err e"
+    assert result.ok("a") != result.err("a")
+    assert result.ok("a").val == ("Ok", "a")
+    for r in (result.ok([1]), result.err([2])):
+        assert pickle.loads(pickle.dumps(r)) == r
+
+
+def test_Result_match_tagged_val():
+    def describe(r: result.Result[str, str]) -> str:
+        match r:
+            case result.Result(("Ok", v)):
+                return f"ok {v}"
+            case result.Result(("Err", e)):
+                return f"err {e}"
+        return "?"
+
+    assert describe(result.ok("a")) == "ok a"
+    assert describe(result.err("e")) == "err e"
+    with pytest.raises(TypeError):
+        result.Result()  # type: ignore[abstract]
+
+
+def parse(s: str) -> result.Result[int, str]:
+    return result.ok(int(s)) if s.isdigit() else result.err(s)
+
+
+@given(st.lists(st.sampled_from(["1", "22", "x", "y"])))
+def test_traverse_sequence(xs: list[str]):
+    errors = [x for x in xs if not x.isdigit()]
+    values = [int(x) for x in xs if x.isdigit()]
+    expected = result.err(errors[0]) if errors else result.ok(values)
+    assert result.traverse(parse, iter(xs)) == expected
+    assert result.sequence(map(parse, xs)) == expected
+    assert result.traverse(parse, xs, collect=True) == (result.err(errors) if errors else result.ok(values))
+
+
+def test_traverse_short_circuits():
+    pulled = []
+
+    def source():
+        for x in ["1", "x", "2"]:
+            pulled.append(x)
+            yield x
+
+    assert result.traverse(parse, source()) == result.err("x")
+    assert pulled == ["1", "x"]
+
+
+@given(st.lists(st.sampled_from(["1", "22", "x", "y"])))
+def test_partition(xs: list[str]):
+    oks, errs = result.partition(map(parse, xs))
+    # interleave reads of the two streams
+    first_err = next(errs, None)
+    assert list(oks) == [int(x) for x in xs if x.isdigit()]
+    assert ([first_err] if first_err is not None else []) + list(errs) == [x for x in xs if not x.isdigit()]
+
+
+def test_partition_is_lazy():
+    oks, _ = result.partition(map(parse, itertools.cycle(["1", "x"])))
+    assert list(itertools.islice(oks, 3)) == [1, 1, 1]
+
+
+def test_partition_rejects_non_results():
+    oks, _ = result.partition([result.ok(1), None, result.ok(2)])  # type: ignore[list-item]
+    assert next(oks) == 1
+    with pytest.raises(TypeError, match="got NoneType"):
+        next(oks)
+
+
+@given(st.lists(st.sampled_from(["1", "22", "x"])))
+def test_traversec(xs: list[str]):
+    async def aparse(s: str) -> result.Result[int, str]:
+        await asyncio.sleep(0)
+        return parse(s)
+
+    expected = result.traverse(parse, xs)
+    assert result.traversec(parse, xs, max_workers=3) == expected
+    assert asyncio.run(result.atraversec(aparse, xs)) == expected
+
+
+def test_traversec_fails_fast():
+    calls = []
+
+    def check(x: int) -> result.Result[int, int]:
+        calls.append(x)
+        time.sleep(0.001)
+        return result.err(x) if x == 0 else result.ok(x)
+
+    assert result.traversec(check, itertools.count(), max_workers=2, window=4) == result.err(0)
+    assert len(calls) <= 4
@@ -0,0 +1,66 @@
+import queue
+import threading
+
+import pytest
+
+from compositio import sinks
+from compositio.writer import Writer, tell, write
+
+
+def run(monoid, n: int) -> Writer:
+    w = Writer.pure(0, monoid)
+    for _ in range(n):
+        w = w @ (lambda x: tell(x + 1, x, monoid))
+    return w
+
+
+def test_ring_buffer_is_bounded():
+    ring = sinks.RingBuffer(10)
+    assert run(sinks.streaming(ring), 1000).run() == (1000, 1000)
+    assert ring.entries() == list(range(990, 1000))
+    assert ring.dropped == 990
+
+
+def test_streaming_list_writers():
+    ring = sinks.RingBuffer(10)
+    w = Writer.pure("a", sinks.streaming(ring)) @ (lambda s: write(s + "b", "b")) @ (lambda s: write(s + "c", "c"))
+    assert w.run() == ("abc", 2)
+    assert ring.entries() == ["b", "c"]
+
+
+def test_file_sink(tmp_path):
+    path = tmp_path / "log.txt"
+    sink = sinks.FileSink(path, buffer_size=100)
+    run(sinks.streaming(sink), 250)
+    assert len(path.read_text().splitlines()) == 200
+    sink.close()
+    assert path.read_text().splitlines() == [str(x) for x in range(250)]
+
+
+def test_queue_sink():
+    consumed = []
+    sink = sinks.QueueSink(consumed.append, maxsize=4)
+    run(sinks.streaming(sink), 100)
+    sink.flush()
+    assert consumed == list(range(100))
+    sink.close()
+
+
+def test_queue_sink_back_pressure():
+    gate = threading.Event()
+    sink = sinks.QueueSink(lambda _: gate.wait(), maxsize=2, timeout=0.05)
+    with pytest.raises(queue.Full):
+        for i in range(10):
+            sink.write(i)
+    gate.set()
+    sink.close()
+
+
+def test_queue_sink_error():
+    def fail(_):
+        raise ValueError("boom")
+
+    sink = sinks.QueueSink(fail)
+    sink.write(1)
+    with pytest.raises(ValueError):
+        sink.flush()
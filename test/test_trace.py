@@ -0,0 +1,96 @@
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+from compositio.aio import AsyncArrow
+from compositio.arrows import Arrow, mapa, mapca
+from compositio.trace import Profile, instrument
+
+
+def add1(x: int) -> int:
+    return x + 1
+
+
+def mul2(x: int) -> int:
+    return x * 2
+
+
+def test_instrument_nested_stages():
+    profile = Profile()
+    pipeline = Arrow(add1) >> (Arrow(add1) % Arrow(mul2)) >> (Arrow(mul2) * Arrow(add1)) >> sum
+    traced = instrument(pipeline, profile)
+    assert traced(1) == pipeline(1)
+    report = profile.report()
+    assert set(report) == {
+        "pipeline",
+        "pipeline;add1",
+        "pipeline;Fanout",
+        "pipeline;Fanout;add1",
+        "pipeline;Fanout;mul2",
+        "pipeline;Split",
+        "pipeline;Split;mul2",
+        "pipeline;Split;add1",
+        "pipeline;sum",
+    }
+    assert all(stats["calls"] == 1 for stats in report.values())
+
+
+@dataclass(frozen=True)
+class Point:
+    x: int
+
+
+def test_instrument_dataclass_constructor():
+    # A dataclass used as a stage is a constructor, not a node to descend into.
+    profile = Profile()
+    assert instrument(Arrow(add1) >> Point, profile)(1) == Point(2)
+    assert set(profile.report()) == {"pipeline", "pipeline;add1", "pipeline;Point"}
+
+
+def test_instrument_maps():
+    profile = Profile()
+    traced = instrument(mapa(add1) >> mapca(mul2) >> list, profile, name="etl")
+    assert traced(range(10)) == [mul2(add1(x)) for x in range(10)]
+    report = profile.report()
+    assert report["etl;Map;add1"]["calls"] == 10
+    assert report["etl;ConcurrentMap;mul2"]["calls"] == 10
+    assert report["etl;list"]["p99"] >= report["etl;list"]["p50"] >= 0
+
+
+def test_instrument_errors_and_hook():
+    events = []
+    profile = Profile(hook=events.append)
+    traced = instrument(Arrow(add1) >> (lambda x: 1 // 0), profile)
+    with pytest.raises(ZeroDivisionError):
+        traced(1)
+    assert profile.report()["pipeline;<lambda>"]["errors"] == 1
+    assert [e.path for e in events] == [("pipeline", "add1"), ("pipeline", "<lambda>"), ("pipeline",)]
+    assert isinstance(events[-1].error, ZeroDivisionError)
+
+
+def test_instrument_repeated_names_and_collapsed():
+    profile = Profile()
+    instrument(Arrow(add1) >> add1, profile)(1)
+    collapsed = dict(line.rsplit(" ", 1) for line in profile.to_collapsed().splitlines())
+    assert set(collapsed) == {"pipeline", "pipeline;add1", "pipeline;add1[1]"}
+    assert all(int(v) >= 0 for v in collapsed.values())
+    assert "pipeline;add1[1]" in profile.to_json()
+
+
+def test_instrument_async():
+    async def fetch(x: int) -> int:
+        await asyncio.sleep(0.01)
+        return x
+
+    profile = Profile()
+    traced = instrument(AsyncArrow(fetch) >> add1, profile)
+    assert isinstance(traced, AsyncArrow)
+    assert asyncio.run(traced(1)) == 2
+    assert profile.report()["pipeline;fetch"]["total"] >= 0.01
+
+
+def test_uninstrumented_arrow_is_unchanged():
+    pipeline = Arrow(add1) >> mul2
+    instrument(pipeline, Profile())
+    assert pipeline.stages == (add1, mul2)
@@ -1,6 +1,10 @@
+import functools
+from collections import Counter
+
 from hypothesis import given
 from hypothesis import strategies as st
 
+from compositio import monoid as M
 from compositio import writer
 from compositio.combinators import compose, curry
 
@@ -48,3 +52,63 @@ def test_Writer_bind_op():
     assert m @ appendM("s") == writer.Writer("as", ["append"])
     assert m @ appendM("s") @ appendM("t") == writer.Writer("ast", ["append", "append"])
     assert m @ (lambda s: appendM("s")(s) @ appendM("t")) == writer.Writer("ast", ["append", "append"])
+
+
+def test_Writer_bind_calls_f_once():
+    calls = []
+
+    def step(x: str):
+        calls.append(x)
+        return writer.write(x + "!", x)
+
+    assert (writer.Writer.pure("a") @ step @ step).run() == ("a!!", ["a", "a!"])
+    assert calls == ["a", "a!"]
+
+
+def test_Writer_long_chain():
+    m = writer.Writer.pure(0)
+    for _ in range(100_000):
+        m = m @ (lambda x: writer.write(x + 1, x))
+    val, log = m.run()
+    assert val == 100_000
+    assert log == list(range(100_000))
+    assert list(reversed(m.con)) == log[::-1]
+    assert (m.con[-1], m.con.index(99_999), m.con.count(5), 5 in m.con) == (99_999, 99_999, 1, True)
+
+
+def test_Writer_monoids():
+    def step(x: int):
+        return writer.tell(x + 1, x, monoid)
+
+    for monoid, expected in [
+        (M.SUM, 4950),
+        (M.MIN, 0),
+        (M.MAX, 99),
+        (M.COUNTER, Counter({x: 1 for x in range(100)})),
+        (M.histogram([10, 50]), (10, 40, 50)),
+    ]:
+        m = writer.Writer.pure(0, monoid)
+        for _ in range(100):
+            m = m @ step
+        assert m.run() == (100, expected)
+
+
+@given(st.lists(st.integers()), st.lists(st.integers()), st.lists(st.integers()))
+def test_monoid_laws(a, b, c):
+    for monoid in [M.SUM, M.MIN, M.MAX, M.COUNTER, M.histogram([-10, 0, 10]), writer.LOG]:
+        x, y, z = (functools.reduce(monoid.combine, map(monoid.unit, vs), monoid.empty) for vs in (a, b, c))
+        assert monoid.combine(monoid.empty, x) == x == monoid.combine(x, monoid.empty)
+        assert monoid.combine(monoid.combine(x, y), z) == monoid.combine(x, monoid.combine(y, z))
+
+
+def test_Writer_empty_is_not_shared():
+    writer.Writer.pure(1).run()[1].append("leak")
+    writer.Writer.pure(1, M.COUNTER).run()[1]["leak"] += 1
+    assert writer.Writer.pure(1).run() == (1, [])
+    assert writer.Writer.pure(1, M.COUNTER).run() == (1, Counter())
+
+
+def test_Writer_pure_equals_empty_log():
+    assert writer.Writer.pure(1) == writer.Writer(1, []) == writer.Writer.pure(1)
+    assert writer.Writer.pure(1) @ writer.Writer.pure == writer.Writer(1, [])
+    assert writer.tell(1, "a") == writer.Writer(1, ["a"])